@@ -0,0 +1,157 @@
+from typing import Optional, Sequence
+import numpy as np
+from costtable import CostTable
+from explorer import INF
+
+class RescueBounds:
+    """
+    Lower bounds on the total time (makespan) of any rescue plan, computed before running a scheduler.
+    The plan model is that of the schedulers in main.py: every room is explored (walk there +
+    explore_time), and every occupied room is rescued by carrying its occupants to an exit. Each
+    leg costs ceil(distance / velocity), so a walk of length L takes at least ceil(L / velocity).
+    Three bounds are combined:
+      - per room: reach the room from the nearest start, explore it, carry to its nearest exit;
+        no firefighter can finish before the slowest such room is done.
+      - assignment: summed over rooms, the work of exploring and carrying plus the cheapest leg
+        that can end at the room (from a start, another room or an exit).
+      - tour: exploring plus walking a route that visits every room, which is at least the
+        room-to-room minimum spanning tree plus the first leg from a start.
+    The two total-work bounds are split across k firefighters (ceil(work / k)).
+    Topology-only parts (the room submatrix, the MST edges, the cheapest room-or-exit predecessor)
+    are precomputed here, so evaluate() is a few O(rooms x starts) array passes.
+    By default carrying happens at the firefighter's velocity, which is what Firefighter
+    simulates; occupant_pace=True bounds the physical model instead, where carrying moves at the
+    slowest occupant's velocity (capped by the firefighter's). That bound can exceed simulated totals.
+    Rooms that no start can reach are ignored (the schedulers never reach them either).
+    """
+    def __init__(self, table: CostTable):
+        self.table = table
+        self.rooms = np.flatnonzero(table.is_room)
+        rooms = self.rooms
+        is_exit = table.exit_idx == np.arange(len(table.exit_idx))
+        exits = np.flatnonzero(is_exit)
+
+        room_dist = table.dist[np.ix_(rooms, rooms)].copy()
+        np.fill_diagonal(room_dist, INF)
+        # Cheapest leg ending at each room that does not start at a firefighter start
+        pred = room_dist.min(axis=0) if len(rooms) > 1 else np.full(len(rooms), INF, dtype=np.int64)
+        if len(exits):
+            pred = np.minimum(pred, table.dist[np.ix_(exits, rooms)].min(axis=0))
+        self.pred_dist = pred
+        np.fill_diagonal(room_dist, 0)
+        self.mst_edges = _mst_edges(room_dist)  # sorted descending
+        self.mst_connected = len(self.mst_edges) == max(len(rooms) - 1, 0)
+
+    def evaluate(self, starts: Sequence[int], velocity: int, k: int = 1, occupants: Optional[np.ndarray] = None,
+                 slowest: Optional[np.ndarray] = None, occupant_pace: bool = False) -> dict:
+        """
+        Returns the bounds for k firefighters of (at most) `velocity` starting at the location indices `starts`.
+        occupants / slowest override the table's per-location arrays (e.g. for occupancy sweeps).
+        Keys: per_room, assignment, tour, bound (the best of them after dividing the work by k).
+        """
+        table = self.table
+        rooms = self.rooms
+        occupants = table.occupants if occupants is None else occupants
+        slowest = table.slowest if slowest is None else slowest
+        start_dist = table.dist[np.asarray(starts, dtype=np.int64)[:, None], rooms].min(axis=0)
+        reachable = start_dist < INF
+        if not reachable.any():
+            return {"per_room": 0, "assignment": 0, "tour": 0, "bound": 0}
+        rooms = rooms[reachable]
+        start_dist = start_dist[reachable]
+
+        explore = table.explore_time[rooms]
+        occupied = occupants[rooms] > 0
+        exit_dist = table.exit_dist[rooms]
+        if occupant_pace:
+            pace = np.minimum(np.where(slowest[rooms] > 0, slowest[rooms], velocity), velocity)
+        else:
+            pace = velocity
+        carry = np.where(occupied & (exit_dist < INF), -(-exit_dist // pace), 0)
+
+        reach = -(-start_dist // velocity)
+        per_room = int((reach + explore + carry).max())
+
+        first_leg = np.minimum(start_dist, self.pred_dist[reachable])
+        assignment = int(explore.sum() + (-(-first_leg // velocity)).sum() + carry.sum())
+
+        tour = 0
+        if self.mst_connected and reachable.all():
+            # A forest of k walks covering all rooms weighs at least the MST minus its k-1 heaviest edges
+            route = int(self.mst_edges[k - 1:].sum()) + int(start_dist.min())
+            tour = int(explore.sum()) + -(-route // velocity)
+
+        bound = max(per_room, -(-assignment // k), -(-tour // k))
+        return {"per_room": per_room, "assignment": assignment, "tour": tour, "bound": int(bound)}
+
+def _mst_edges(dist: np.ndarray) -> np.ndarray:
+    """Weights of a minimum spanning forest of the dense distance matrix (INF = no edge), largest first."""
+    n = len(dist)
+    if n <= 1:
+        return np.zeros(0, dtype=np.int64)
+    try:
+        from scipy.sparse.csgraph import minimum_spanning_tree
+    except ImportError:
+        minimum_spanning_tree = None
+    if minimum_spanning_tree is not None:
+        # csgraph treats 0 as "no edge"; shift weights by one and subtract it again afterwards
+        shifted = np.where(dist < INF, dist + 1, 0).astype(np.float64)
+        np.fill_diagonal(shifted, 0)
+        weights = minimum_spanning_tree(shifted).data.astype(np.int64) - 1
+        return np.sort(weights)[::-1]
+
+    # Prim's algorithm, one vectorized pass per added vertex
+    in_tree = np.zeros(n, dtype=bool)
+    best = np.full(n, INF, dtype=np.int64)
+    weights = []
+    for _ in range(n):
+        candidates = np.where(in_tree, INF + 1, best)
+        u = int(np.argmin(candidates))
+        if candidates[u] == INF + 1:
+            break
+        if in_tree.any() and best[u] < INF:
+            weights.append(int(best[u]))
+        in_tree[u] = True
+        best = np.minimum(best, dist[u])
+    return np.sort(np.array(weights, dtype=np.int64))[::-1]
+
+# Benchmark: python bounds.py [side]
+# Bounds for the Figure 1 scenarios, then evaluation time on a building with about a thousand rooms.
+if __name__ == "__main__":
+    import sys
+    import time
+    from drawer import load_basic_floor
+    from explorer import Explorer
+    from landmarks import grid_graph
+    from location import Location, Room
+    from person import Person
+
+    table = CostTable(Explorer(load_basic_floor('Figure1_building_structure.json')))
+    bounds = RescueBounds(table)
+    print("1 firefighter from EXIT_R:", bounds.evaluate([table.idx("EXIT_R")], 5))
+    print("2 firefighters from EXIT_L, EXIT_R:", bounds.evaluate(table.idx(["EXIT_L", "EXIT_R"]), 5, k=2))
+    print("1 firefighter, carrying at occupant pace:", bounds.evaluate([table.idx("EXIT_R")], 5, occupant_pace=True))
+
+    # side x side corridor grid; two of every three cells are occupied rooms, exits on the left column
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    graph = grid_graph(side, side)
+    pid = 0
+    for i in range(len(graph)):
+        r, c = divmod(i, side)
+        if c == 0:
+            graph.locations[i] = Location(f"EXIT_{r}", True, False)
+        elif (r + c) % 3:
+            graph.locations[i] = Room(f"R_{r}_{c}", False, False, 1, 1 + i % 5, {pid: Person(pid, 1 + i % 4)})
+            pid += 1
+    # The multi-core Floyd-Warshall instead of the pure-Python one
+    table = CostTable(Explorer(graph, method="parallel_fw"))
+    t0 = time.perf_counter()
+    bounds = RescueBounds(table)
+    t_setup = time.perf_counter() - t0
+    starts = [table.idx("EXIT_0"), table.idx(f"EXIT_{side - 1}")]
+    runs = 1000
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        result = bounds.evaluate(starts, 5, k=2)
+    elapsed = (time.perf_counter() - t0) / runs
+    print(f"\n{len(bounds.rooms)} rooms: setup {t_setup * 1e3:.1f} ms, evaluate {elapsed * 1e6:.0f} us -> {result}")
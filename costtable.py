@@ -0,0 +1,117 @@
+from typing import Optional
+import numpy as np
+from explorer import Explorer, INF
+from location import Room
+
+class CostTable:
+    """
+    Dense per-location cost arrays precomputed from an Explorer, so schedulers and planners can
+    score candidate plans with array arithmetic instead of calling Firefighter actions.
+    All arrays are indexed by location index (explorer.label_to_idx):
+      - dist: (n, n) int64           - Shortest distances (INF if unreachable).
+      - exit_dist: (n,) int64        - Distance to the nearest exit (INF if none is reachable).
+      - exit_idx: (n,) int64         - Index of that exit (-1 if none), same choice as Explorer.find_nearest_exit.
+      - explore_time: (n,) int64     - Room.explore_time, 0 for exits and hallways.
+      - is_room: (n,) bool
+      - occupants: (n,) int64        - Number of people in the location.
+      - slowest: (n,) int64          - Lowest occupant velocity (0 if empty).
+    Times follow the Firefighter rules: each leg takes ceil(distance / velocity). Unreachable legs
+    take INF, and totals containing one are INF.
+    The table is a snapshot; rebuild it after the graph or the occupants change.
+    """
+    def __init__(self, explorer: Explorer):
+        if explorer.dist is None:
+            raise ValueError("CostTable needs the dense Floyd-Warshall tables (Explorer without backend)")
+        graph = explorer.graph
+        n = len(graph)
+        self.labels = list(explorer.labels)
+        self.label_to_idx = dict(explorer.label_to_idx)
+        self.dist = np.array(explorer.dist, dtype=np.int64).reshape(n, n)
+
+        exits = np.array([i for i in range(n) if getattr(graph.get_location(i), "is_exit", False)], dtype=np.int64)
+        if len(exits):
+            to_exits = self.dist[:, exits]
+            nearest = np.argmin(to_exits, axis=1)  # first minimum, like find_nearest_exit
+            self.exit_dist = to_exits[np.arange(n), nearest]
+            self.exit_idx = np.where(self.exit_dist < INF, exits[nearest], -1)
+        else:
+            self.exit_dist = np.full(n, INF, dtype=np.int64)
+            self.exit_idx = np.full(n, -1, dtype=np.int64)
+
+        self.explore_time = np.zeros(n, dtype=np.int64)
+        self.is_room = np.zeros(n, dtype=bool)
+        self.occupants = np.zeros(n, dtype=np.int64)
+        self.slowest = np.zeros(n, dtype=np.int64)
+        for i in range(n):
+            location = graph.get_location(i)
+            if isinstance(location, Room):
+                self.is_room[i] = True
+                self.explore_time[i] = location.explore_time
+            people = getattr(location, "person_list", {})
+            self.occupants[i] = len(people)
+            if people:
+                self.slowest[i] = min(p.velocity for p in people.values())
+
+    def idx(self, labels) -> np.ndarray:
+        """Converts a label or a (nested) sequence of labels to an index array."""
+        if isinstance(labels, str):
+            return np.int64(self.label_to_idx[labels])
+        return np.array([self.idx(x) for x in labels], dtype=np.int64)
+
+    def walk_time(self, src, dst, velocity) -> np.ndarray:
+        """Elementwise ceil(dist[src, dst] / velocity) for broadcastable index arrays (INF if unreachable)."""
+        return _leg_time(self.dist[src, dst], velocity)
+
+    def explore_cost(self, start, order, velocity: int) -> np.ndarray:
+        """
+        Total time of exploring rooms in the given order from `start`, as in repeated exploreRoom calls.
+        order may be (k,) or a batch of plans (m, k) with start of shape () or (m,).
+        Returns a scalar or an (m,) array.
+        """
+        order = np.asarray(order, dtype=np.int64)
+        start = np.asarray(start, dtype=np.int64)
+        prev = np.concatenate([np.broadcast_to(start, order.shape[:-1])[..., None], order[..., :-1]], axis=-1)
+        return np.minimum((self.walk_time(prev, order, velocity) + self.explore_time[order]).sum(axis=-1), INF)
+
+    def rescue_cost(self, start, rooms, velocity: int, carry_velocity: Optional[int] = None) -> np.ndarray:
+        """
+        Total time of rescuing rooms in the given order to their nearest exits, as in repeated
+        resecueRoomToNearestExit + unload calls; each trip starts at the previous room's exit.
+        carry_velocity defaults to `velocity`, which is what Firefighter uses for the carrying leg.
+        Shapes as in explore_cost.
+        """
+        rooms = np.asarray(rooms, dtype=np.int64)
+        start = np.asarray(start, dtype=np.int64)
+        carry = velocity if carry_velocity is None else carry_velocity
+        prev = np.concatenate([np.broadcast_to(start, rooms.shape[:-1])[..., None], self.exit_idx[rooms[..., :-1]]], axis=-1)
+        # A room without a reachable exit has exit_idx -1; its own carry leg already makes the total INF
+        total = (self.walk_time(prev, rooms, velocity) + _leg_time(self.exit_dist[rooms], carry)).sum(axis=-1)
+        return np.minimum(total, INF)
+
+    def room_rescue_time(self, velocity: int) -> np.ndarray:
+        """
+        (n,) time to carry each room's occupants to the nearest exit at the slowest occupant's pace
+        (capped by velocity); INF where no exit is reachable.
+        """
+        pace = np.where(self.slowest > 0, np.minimum(self.slowest, velocity), velocity)
+        return _leg_time(self.exit_dist, pace)
+
+def _leg_time(distance: np.ndarray, velocity) -> np.ndarray:
+    """ceil(distance / velocity), keeping INF distances at INF."""
+    return np.where(distance >= INF, INF, -(-distance // velocity))
+
+# Example: python costtable.py
+# Re-scores the plan that main.rescue_building_1FF executes (BFS exploration from EXIT_R, then rescues).
+if __name__ == "__main__":
+    from drawer import load_basic_floor
+    table = CostTable(Explorer(load_basic_floor('Figure1_building_structure.json')))
+    start = table.idx("EXIT_R")
+    explored = table.idx(["TR", "BR", "TM", "BM", "TL", "BL"])
+    waiting = table.idx(["TR", "BR", "TM", "BM", "TL"])
+    explore = table.explore_cost(start, explored, 5)
+    rescue = table.rescue_cost(explored[-1], waiting, 5)
+    print("1 firefighter plan:", int(explore), "+", int(rescue), "=", int(explore + rescue))
+
+    # Score every rotation of the rescue order in one batch
+    rotations = np.stack([np.roll(waiting, k) for k in range(len(waiting))])
+    print("Rescue order rotations:", table.rescue_cost(explored[-1], rotations, 5))
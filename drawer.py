@@ -88,13 +88,8 @@ def load_basic_floor(filepath: str) -> Graph:
 
 def draw_with_networkx(g: Graph, figsize=(8, 6)) -> None:
     """Draw a static graph with networkx + matplotlib. Node labels use Location.label."""
-    G = nx.Graph()
-    # Add nodes
-    for v in g.vertices():
-        G.add_node(v)
-    # Add edges (with weights)
-    for u, v, w in g.edges():
-        G.add_edge(u, v, weight=w)
+    # Shared conversion, cached by the graph until it mutates
+    G = g.to_networkx()
     # Node labels: display Location.label, number of people, exploration time, etc.
     label_map = {}
     for n in G.nodes():
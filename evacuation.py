@@ -0,0 +1,165 @@
+from heapq import heappush, heappop
+from typing import Dict, List, Tuple
+import numpy as np
+from graph import Graph
+from location import Room
+
+# Occupant status codes
+WAITING = 0   # Not ambulatory (or no route): stays until a firefighter carries them out
+WALKING = 1
+EXITED = 2
+
+class SelfEvacuation:
+    """
+    Moves every ambulatory occupant (velocity >= min_velocity) toward their nearest exit at once.
+    Occupants are not simulated as Person objects but as parallel arrays:
+      - pos: (p,) int64          - Location the occupant last reached.
+      - progress: (p,) float64   - Distance walked along the edge from pos to its next hop.
+      - velocity: (p,) float64
+      - status: (p,) int8        - WAITING, WALKING or EXITED.
+      - room: (p,) int64         - Room the occupant started in.
+    Routing uses two per-location arrays from one multi-source Dijkstra rooted at the exits: the
+    next hop toward the nearest exit and the length of that edge, so a tick is a few array passes
+    regardless of the number of occupants. When occupants leave their starting room it gets a new
+    person_list without them (so BuildingSession journals the change), and firefighter schedulers
+    find the room empty.
+    """
+    def __init__(self, graph: Graph, min_velocity: int = 2):
+        self.graph = graph
+
+        # Per-location routing: next hop toward the nearest exit and that edge's length
+        self.is_exit = np.array([bool(getattr(loc, "is_exit", False)) for loc in graph.locations], dtype=bool)
+        self.exit_next, self.hop_length = _exit_routes(graph, self.is_exit)
+
+        rooms: List[int] = []
+        velocities: List[int] = []
+        ids: List[int] = []
+        for i, location in enumerate(graph.locations):
+            if isinstance(location, Room):
+                for pid, person in location.person_list.items():
+                    rooms.append(i)
+                    velocities.append(person.velocity)
+                    ids.append(pid)
+        self.room = np.array(rooms, dtype=np.int64)
+        self.person_id = np.array(ids, dtype=np.int64)
+        self.velocity = np.array(velocities, dtype=np.float64)
+        self.pos = self.room.copy()
+        self.progress = np.zeros(len(rooms))
+        self.status = np.where((self.velocity >= min_velocity) & (self.exit_next[self.room] >= 0), WALKING, WAITING).astype(np.int8)
+        self.status[self.is_exit[self.room]] = EXITED
+        self.in_room = np.ones(len(rooms), dtype=bool)
+        self.time = 0.0
+
+    def step(self, dt: float = 1.0) -> np.ndarray:
+        """Advances all walkers by dt time units. Returns the indices of occupants who left their room."""
+        walking = np.flatnonzero(self.status == WALKING)
+        self.progress[walking] += self.velocity[walking] * dt
+        # Repeatedly move everyone who has covered their current edge; one pass per hop
+        while len(walking):
+            here = self.pos[walking]
+            arrived = self.progress[walking] >= self.hop_length[here]
+            if not arrived.any():
+                break
+            movers = walking[arrived]
+            self.progress[movers] -= self.hop_length[self.pos[movers]]
+            self.pos[movers] = self.exit_next[self.pos[movers]]
+            done = self.is_exit[self.pos[movers]]
+            self.status[movers[done]] = EXITED
+            self.progress[movers[done]] = 0.0
+            walking = movers[~done]
+        self.time += dt
+
+        left = np.flatnonzero(self.in_room & (self.pos != self.room))
+        if len(left):
+            self.in_room[left] = False
+            self._remove_from_rooms(left)
+        return left
+
+    def advance_to(self, t: float, dt: float = 1.0) -> None:
+        """Steps until self.time reaches t (no-op if already past it); the last step may be shorter."""
+        while self.time < t - 1e-9:
+            self.step(min(dt, t - self.time))
+
+    def _remove_from_rooms(self, left: np.ndarray) -> None:
+        graph = self.graph
+        rooms = self.room[left]
+        order = np.argsort(rooms, kind="stable")
+        rooms = rooms[order]
+        ids = self.person_id[left][order]
+        bounds = np.flatnonzero(np.diff(rooms)) + 1
+        for group_rooms, group_ids in zip(np.split(rooms, bounds), np.split(ids, bounds)):
+            location = graph.get_location(int(group_rooms[0]))
+            gone = set(group_ids.tolist())
+            location.person_list = {pid: p for pid, p in location.person_list.items() if pid not in gone}
+
+    def counts(self) -> Dict[str, int]:
+        """Number of occupants waiting, walking and out."""
+        c = np.bincount(self.status, minlength=3)
+        return {"waiting": int(c[WAITING]), "walking": int(c[WALKING]), "exited": int(c[EXITED])}
+
+def _exit_routes(graph: Graph, is_exit: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Multi-source Dijkstra from all exits. Returns (next hop toward the nearest exit, its edge length); -1 / inf where none."""
+    n = len(graph)
+    dist = [float("inf")] * n
+    exit_next = np.full(n, -1, dtype=np.int64)
+    hop_length = np.full(n, np.inf)
+    heap = []
+    for e in np.flatnonzero(is_exit).tolist():
+        dist[e] = 0
+        heap.append((0, e))
+    adj = graph._adj
+    while heap:
+        d, x = heappop(heap)
+        if d > dist[x]:
+            continue
+        for y, w in adj[x].items():
+            nd = d + w
+            if nd < dist[y]:
+                dist[y] = nd
+                exit_next[y] = x
+                hop_length[y] = w
+                heappush(heap, (nd, y))
+    return exit_next, hop_length
+
+# Example / benchmark: python evacuation.py
+if __name__ == "__main__":
+    import time
+    from drawer import load_basic_floor
+    from landmarks import grid_graph
+    from location import Location
+    from person import Person
+
+    graph = load_basic_floor('Figure1_building_structure.json')
+    evac = SelfEvacuation(graph)
+    print("Figure 1 building, occupants with velocity >= 2 walk out:")
+    for t in range(0, 9, 2):
+        evac.advance_to(t)
+        rooms = {loc.label: len(loc.person_list) for loc in graph.locations if isinstance(loc, Room)}
+        print(f"  t={t}: {evac.counts()} rooms={rooms}")
+
+    # 100k occupants spread over the rooms of a 60x60 grid building (exits on the left column)
+    side = 60
+    big = grid_graph(side, side)
+    rnd = np.random.default_rng(0)
+    pid = 0
+    for i in range(len(big)):
+        r, c = divmod(i, side)
+        if c == 0:
+            big.locations[i] = Location(f"EXIT_{r}", True, False)
+        elif (r + c) % 3 == 0:
+            people = {}
+            for v in rnd.integers(1, 7, size=84):
+                people[pid] = Person(pid, int(v))
+                pid += 1
+            big.locations[i] = Room(f"R_{r}_{c}", False, False, 1, 1, people)
+    t0 = time.perf_counter()
+    evac = SelfEvacuation(big)
+    t_setup = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    ticks = 0
+    while evac.counts()["walking"]:
+        evac.step()
+        ticks += 1
+    elapsed = time.perf_counter() - t0
+    print(f"\n{len(evac.status)} occupants on {len(big)} locations: setup {t_setup:.1f} s,"
+          f" {ticks} ticks in {elapsed * 1e3:.0f} ms ({elapsed / ticks * 1e3:.2f} ms/tick), {evac.counts()}")
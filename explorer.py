@@ -1,14 +1,133 @@
-from typing import List, Optional, Tuple
+from typing import TYPE_CHECKING, List, Optional, Tuple
 from graph import Graph
 from location import Location  # Added import
+from timedep import TimeDependentRouter
+
+if TYPE_CHECKING:
+    from query_engine import QueryEngine
+    from routes import EscapeRoutes
 
 INF = 10**9  # A large integer to represent infinity
 
 class Explorer:
-    def __init__(self, graph: Graph):
+    def __init__(self, graph: Graph, backend=None, cache=None, method: str = "floyd_warshall"):
+        """
+        backend: optional point-to-point index (e.g. landmarks.LandmarkIndex) answering
+        query(u, v) -> (distance, path_indices) and nearest(u, targets). When given, the dense
+        Floyd-Warshall tables are not built and self.dist / self.nxt are None.
+        cache: optional explorer_cache.ExplorerCache (or its directory) to load the tables from
+        when the same topology was computed before, and to store them in otherwise.
+        method: how the dense tables are computed, "floyd_warshall" (pure Python), "parallel_fw"
+        (parallel_fw.parallel_floyd_warshall on all cores, same next hops as "floyd_warshall") or
+        "csgraph" (scipy.sparse.csgraph.shortest_path over graph.to_csr()). Distances are identical;
+        on equal-length alternatives csgraph may pick different next hops.
+        """
+        if method not in ("floyd_warshall", "parallel_fw", "csgraph"):
+            raise ValueError(f"Unknown shortest path method {method!r}")
         self.graph = graph
-        self.dist, self.nxt, self.labels = self._get_distance_matrix()
+        self.method = method
+        self.backend = backend
+        if isinstance(cache, str):
+            from explorer_cache import ExplorerCache
+            cache = ExplorerCache(cache)
+        self.cache = cache
+        if backend is None:
+            self.dist, self.nxt, self.labels = self._get_distance_matrix()
+        else:
+            self.dist, self.nxt, self.labels = None, None, self._get_labels()
         self.label_to_idx: dict = {label: i for i, label in enumerate(self.labels)}
+        self.td_router = TimeDependentRouter(graph)
+        self._escape_routes = None
+
+    def refresh(self) -> None:
+        """
+        Recomputes the shortest path tables after the graph was mutated (e.g. edges closed by a hazard).
+        With a backend nothing needs rebuilding: queries read the live graph, and landmark bounds stay
+        admissible as long as the graph only lost edges relative to the one the index was built on.
+        """
+        if self.backend is None:
+            self.dist, self.nxt, self.labels = self._get_distance_matrix()
+        else:
+            self.labels = self._get_labels()
+        self.label_to_idx = {label: i for i, label in enumerate(self.labels)}
+
+    def update_edge(self, u: int, v: int, weight: Optional[int]) -> bool:
+        """
+        Sets the weight of edge u--v in the graph (None removes it) and updates the tables incrementally:
+          - a weight at most the current u-v distance can only shorten paths, so every pair is relaxed
+            through the edge in O(n^2);
+          - raising or removing an edge that no shortest path relies on (it was not tight) changes nothing;
+          - otherwise the tables are recomputed.
+        With a backend there are no tables, but an added or shortened edge can make its lower bounds
+        inadmissible, so the backend is rebuilt (backend.rebuild()) in that case.
+        Returns True if the tables or the backend were recomputed from scratch.
+        """
+        old = self.graph.weight(u, v)
+        if weight is None:
+            self.graph.remove_edge(u, v)
+        else:
+            self.graph.add_edge(u, v, weight)
+        self.invalidate_escape_routes()
+        return self.edges_changed([(u, v, old, weight)])
+
+    def invalidate_escape_routes(self) -> None:
+        """Drops the escape routes after edge weights changed; they are ranked by weight and rebuilt lazily on next use."""
+        if self._escape_routes is not None:
+            self._escape_routes.close()
+            self._escape_routes = None
+
+    def edges_changed(self, changes: List[Tuple[int, int, Optional[int], Optional[int]]]) -> bool:
+        """
+        Updates the tables (or backend) for edges already changed in the graph, as update_edge does,
+        given (u, v, old weight, new weight) tuples with None for a missing edge. A batch costs at most
+        one recomputation: it happens if any raised or removed edge was tight; otherwise every
+        shortened or added edge is relaxed in turn. Escape routes are left alone, since they follow
+        removed and re-added edges themselves. Returns True if anything was recomputed from scratch.
+        """
+        if self.backend is not None:
+            if any(new is not None and (old is None or new < old) for _, _, old, new in changes):
+                self.backend = self.backend.rebuild()
+                return True
+            return False
+        dist = self.dist
+        for u, v, old, new in changes:
+            if old is not None and (new is None or new > old) and old <= dist[u][v]:
+                self.dist, self.nxt, self.labels = self._get_distance_matrix()
+                return True
+        for u, v, old, new in changes:
+            if new is not None and new < dist[u][v]:
+                self._relax_through(u, v, new)
+        return False
+
+    def _relax_through(self, u: int, v: int, w: int) -> None:
+        """Lowers every dist[i][j] that improves by walking i -> u -> v -> j or i -> v -> u -> j."""
+        dist, nxt = self.dist, self.nxt
+        n = len(dist)
+        du, dv = list(dist[u]), list(dist[v])  # rows before the update (dist is symmetric)
+        for i in range(n):
+            row, nrow = dist[i], nxt[i]
+            iu, iv = du[i], dv[i]
+            if iu == INF and iv == INF:
+                continue
+            via_uv = iu + w  # i -> u -> v
+            via_vu = iv + w  # i -> v -> u
+            hop_u = nrow[u] if i != u else v
+            hop_v = nrow[v] if i != v else u
+            for j in range(n):
+                a = via_uv + dv[j]
+                b = via_vu + du[j]
+                if a <= b:
+                    if a < row[j]:
+                        row[j] = a
+                        nrow[j] = hop_u
+                elif b < row[j]:
+                    row[j] = b
+                    nrow[j] = hop_v
+
+    def freeze(self) -> "QueryEngine":
+        """Returns an immutable query_engine.QueryEngine over the current tables, safe to share across threads."""
+        from query_engine import QueryEngine
+        return QueryEngine.from_explorer(self)
 
     def _floyd_warshall(self) -> Tuple[List[List[int]], List[List[Optional[int]]]]:
         """
@@ -45,6 +164,27 @@ class Explorer:
 
         return dist, nxt
 
+    def _csgraph_shortest_paths(self) -> Tuple[List[List[int]], List[List[Optional[int]]]]:
+        """
+        Same contract as _floyd_warshall, computed with scipy's compiled all-pairs Dijkstra.
+        The next hop from i toward j is the predecessor of i on the shortest path tree rooted at j.
+        """
+        import numpy as np
+        from scipy.sparse.csgraph import shortest_path
+        n = len(self.graph)
+        if n == 0:
+            return [], []
+        d, pred = shortest_path(self.graph.to_csr(), method="D", directed=False, return_predecessors=True)
+        dist = np.where(np.isinf(d), INF, d).astype(np.int64)
+        nxt = pred.T.copy()
+        np.fill_diagonal(nxt, np.arange(n))
+        return dist.tolist(), [[None if x < 0 else x for x in row] for row in nxt.tolist()]
+
+    def _parallel_shortest_paths(self) -> Tuple[List[List[int]], List[List[Optional[int]]]]:
+        """Same contract (and next hops) as _floyd_warshall, computed by the multi-core blocked Floyd-Warshall."""
+        from parallel_fw import parallel_floyd_warshall, to_lists
+        return to_lists(*parallel_floyd_warshall(self.graph))
+
     def _get_distance_matrix(self) -> Tuple[List[List[int]], List[List[Optional[int]]], List[str]]:
         """
         Calculates the shortest path matrix for the graph.
@@ -53,13 +193,30 @@ class Explorer:
           - next[i][j] is the next hop for reconstructing the path
           - labels[i] is the label of node i
         """
-        dist, nxt = self._floyd_warshall()
+        compute = {"floyd_warshall": self._floyd_warshall, "parallel_fw": self._parallel_shortest_paths,
+                   "csgraph": self._csgraph_shortest_paths}[self.method]
+        if self.cache is None:
+            dist, nxt = compute()
+            return dist, nxt, self._get_labels()
+
+        from explorer_cache import cache_key
+        key = cache_key(self.graph, self.method)
+        cached = self.cache.load(key)
+        if cached is not None:
+            return cached
+        dist, nxt = compute()
+        labels = self._get_labels()
+        self.cache.store(key, dist, nxt, labels)
+        return dist, nxt, labels
+
+    def _get_labels(self) -> List[str]:
+        """Returns labels[i], the label of node i (its index as a string if unlabeled)."""
         labels: List[str] = []
         for i in range(len(self.graph)):
             location = self.graph.get_location(i)
             lab = getattr(location, "label", "") or str(i)
             labels.append(lab)
-        return dist, nxt, labels
+        return labels
 
     def reconstruct_path(self, u: int, v: int) -> List[int]:
         """
@@ -79,6 +236,22 @@ class Explorer:
                 break
         return path
 
+    def get_path_idx(self, u: int, v: int) -> Tuple[Optional[int], List[int]]:
+        """
+        Index-native get_path: returns (distance, path_indices) between two node indices.
+        If the path does not exist, distance is None and path is empty.
+        """
+        if self.backend is not None:
+            distance, path_indices = self.backend.query(u, v)
+            if distance is None:
+                return None, []
+            return distance, path_indices
+
+        distance = self.dist[u][v]
+        if distance == INF:
+            return None, []
+        return distance, self.reconstruct_path(u, v)
+
     def get_path(self, label_start: str, label_end: str) -> Tuple[Optional[int], List[str]]:
         """
         Calculates the shortest distance and path between two nodes given their labels.
@@ -88,18 +261,37 @@ class Explorer:
         if label_start not in self.label_to_idx or label_end not in self.label_to_idx:
             return None, []
 
-        u = self.label_to_idx[label_start]
-        v = self.label_to_idx[label_end]
+        distance, path_indices = self.get_path_idx(self.label_to_idx[label_start], self.label_to_idx[label_end])
+        return distance, [self.labels[i] for i in path_indices]
 
-        distance = self.dist[u][v]
-        
-        if distance == INF:
-            return None, []
+    def exit_indices(self) -> List[int]:
+        """Returns the indices of all locations currently marked as exits."""
+        return [i for i, location in enumerate(self.graph.locations) if getattr(location, "is_exit", False)]
 
-        path_indices = self.reconstruct_path(u, v)
-        path_labels = [self.labels[i] for i in path_indices]
+    def find_nearest_exit_idx(self, start_idx: int) -> Tuple[Optional[int], Optional[int], List[int]]:
+        """
+        Index-native find_nearest_exit: returns (distance, exit_idx, path_indices).
+        If no path to an exit exists, returns (None, None, []).
+        """
+        exits = self.exit_indices()
+        if not exits:
+            return None, None, []
+
+        if self.backend is not None:
+            return self.backend.nearest(start_idx, exits)
+
+        row = self.dist[start_idx]
+        min_dist = INF
+        best_exit = -1
+        for exit_node in exits:
+            if row[exit_node] < min_dist:
+                min_dist = row[exit_node]
+                best_exit = exit_node
 
-        return distance, path_labels
+        if best_exit != -1 and min_dist != INF:
+            return min_dist, best_exit, self.reconstruct_path(start_idx, best_exit)
+
+        return None, None, []
 
     def find_nearest_exit(self, start_label: str) -> Tuple[Optional[int], Optional[str], List[str]]:
         """
@@ -110,30 +302,79 @@ class Explorer:
         if start_label not in self.label_to_idx:
             return None, None, []
 
-        start_idx = self.label_to_idx[start_label]
-        
-        # Find all exit nodes
-        exits = [i for i in range(len(self.graph)) if getattr(self.graph.get_location(i), "is_exit", False)]
-        
-        if not exits:
+        min_dist, best_exit, path_idx = self.find_nearest_exit_idx(self.label_to_idx[start_label])
+        if min_dist is None:
             return None, None, []
+        return min_dist, self.labels[best_exit], [self.labels[i] for i in path_idx]
 
-        min_dist = INF
-        best_exit = -1
-        for exit_node in exits:
-            if self.dist[start_idx][exit_node] < min_dist:
-                min_dist = self.dist[start_idx][exit_node]
-                best_exit = exit_node
-        
-        if best_exit != -1 and min_dist != INF:
-            path_idx = self.reconstruct_path(start_idx, best_exit)
-            path_labels = [self.labels[i] for i in path_idx]
-            return min_dist, self.labels[best_exit], path_labels
-        
-        return None, None, []
+    def escape_routes(self, k: int = 3, workers: Optional[int] = None) -> "EscapeRoutes":
+        """
+        Returns routes.EscapeRoutes with the k shortest loopless exit routes of every room, built on
+        first use (workers > 1 spreads it over processes). It follows edge removals from then on.
+        """
+        if self._escape_routes is None or self._escape_routes.k != k:
+            from routes import EscapeRoutes
+            if self._escape_routes is not None:
+                self._escape_routes.close()
+            self._escape_routes = EscapeRoutes(self.graph, k=k, workers=workers)
+        return self._escape_routes
+
+    def find_fallback_exit_idx(self, start_idx: int) -> Tuple[Optional[int], Optional[int], List[int]]:
+        """
+        Shortest precomputed exit route from a room that uses no removed edge, without recomputing
+        any table. Returns (distance, exit_idx, path_indices), or (None, None, []).
+        """
+        distance, path_idx = self.escape_routes().fallback(start_idx)
+        if distance is None:
+            return None, None, []
+        return distance, path_idx[-1], path_idx
+
+    def find_fallback_exit(self, start_label: str) -> Tuple[Optional[int], Optional[str], List[str]]:
+        """Label variant of find_fallback_exit_idx: returns (distance, exit_label, path_labels)."""
+        if start_label not in self.label_to_idx:
+            return None, None, []
+        distance, best_exit, path_idx = self.find_fallback_exit_idx(self.label_to_idx[start_label])
+        if distance is None:
+            return None, None, []
+        return distance, self.labels[best_exit], [self.labels[i] for i in path_idx]
+
+    def get_path_at_idx(self, u: int, v: int, depart: float, velocity: float) -> Tuple[Optional[float], List[int]]:
+        """Index-native get_path_at: returns (travel_time, path_indices), or (None, []) if unreachable."""
+        return self.td_router.route(u, v, depart, velocity)
+
+    def get_path_at(self, label_start: str, label_end: str, depart: float, velocity: float) -> Tuple[Optional[float], List[str]]:
+        """
+        Time-dependent variant of get_path for graphs with TravelTimeProfile edges.
+        Returns (travel_time, path_labels) for a walker with the given velocity leaving at `depart`.
+        If a label is not found or path does not exist, travel_time is None and path is empty.
+        """
+        if label_start not in self.label_to_idx or label_end not in self.label_to_idx:
+            return None, []
+        travel, path_idx = self.get_path_at_idx(self.label_to_idx[label_start], self.label_to_idx[label_end], depart, velocity)
+        return travel, [self.labels[i] for i in path_idx]
+
+    def find_nearest_exit_at_idx(self, start_idx: int, depart: float, velocity: float) -> Tuple[Optional[float], Optional[int], List[int]]:
+        """Index-native find_nearest_exit_at: returns (travel_time, exit_idx, path_indices), or (None, None, [])."""
+        return self.td_router.nearest(start_idx, self.exit_indices(), depart, velocity)
+
+    def find_nearest_exit_at(self, start_label: str, depart: float, velocity: float) -> Tuple[Optional[float], Optional[str], List[str]]:
+        """
+        Time-dependent variant of find_nearest_exit: the exit reached earliest when leaving at `depart`.
+        Returns (travel_time, exit_label, path_labels), or (None, None, []) if no exit is reachable.
+        """
+        if start_label not in self.label_to_idx:
+            return None, None, []
+        travel, best_exit, path_idx = self.find_nearest_exit_at_idx(self.label_to_idx[start_label], depart, velocity)
+        if travel is None:
+            return None, None, []
+        return travel, self.labels[best_exit], [self.labels[i] for i in path_idx]
 
     def print_distance_matrix(self) -> None:
         """Prints the shortest path distance matrix and an example path."""
+        if self.dist is None:
+            print("labels:", self.labels)
+            print("No distance matrix: paths are answered by", type(self.backend).__name__)
+            return
         print("labels:", self.labels)
         for i, row in enumerate(self.dist):
             row_str = ["INF" if x == INF else str(int(x)) for x in row]
@@ -0,0 +1,175 @@
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+from typing import List, Optional, Tuple
+from graph import Graph
+
+DEFAULT_DIR = os.environ.get("HIMCM_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "himcm", "explorer"))
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+SUFFIX = ".json"
+STATS_FILE = "_stats.json"
+
+def graph_fingerprint(graph: Graph) -> str:
+    """
+    SHA-256 of the graph's labels, topology and integer weights in canonical form.
+    Occupants, room states, exits and time-dependent profiles do not affect Explorer's tables and are left out.
+    """
+    labels = [getattr(location, "label", "") or str(i) for i, location in enumerate(graph.locations)]
+    edges = sorted(graph.edges())
+    canonical = json.dumps({"n": len(graph), "labels": labels, "edges": edges}, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def cache_key(graph: Graph, method: str = "floyd_warshall") -> str:
+    """Key of the tables of Explorer(graph, method=method); methods may pick different next hops on ties."""
+    return f"{graph_fingerprint(graph)}-{method}"
+
+
+class ExplorerCache:
+    """
+    Content-addressed on-disk cache of Explorer's (dist, nxt, labels), keyed by cache_key
+    (graph_fingerprint plus the Explorer's shortest path method).
+    Entries are written atomically (temporary file + os.replace), a hit refreshes the entry's mtime,
+    and the least recently used entries are evicted once the directory exceeds max_bytes.
+    """
+    def __init__(self, directory: str = DEFAULT_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def load(self, key: str) -> Optional[Tuple[List[List[int]], List[List[Optional[int]]], List[str]]]:
+        """Returns the cached (dist, nxt, labels) for key, or None on a miss or unreadable entry."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self._count("misses")
+            return None
+        self._count("hits")
+        return data["dist"], data["nxt"], data["labels"]
+
+    def store(self, key: str, dist: List[List[int]], nxt: List[List[Optional[int]]], labels: List[str]) -> None:
+        """Writes an entry atomically, then evicts least recently used entries over the size bound."""
+        _atomic_write(self._path(key), json.dumps({"dist": dist, "nxt": nxt, "labels": labels}, separators=(",", ":")))
+        self.evict()
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        """Returns (key, size_bytes, mtime) for every entry, least recently used first."""
+        out = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(SUFFIX) or name == STATS_FILE:
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            out.append((name[:-len(SUFFIX)], st.st_size, st.st_mtime))
+        out.sort(key=lambda e: e[2])
+        return out
+
+    def evict(self) -> int:
+        """Removes least recently used entries until the cache fits in max_bytes. Returns the number removed."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for key, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        if removed:
+            self._count("evictions", removed)
+        return removed
+
+    def clear(self) -> None:
+        for key, _, _ in self.entries():
+            os.remove(self._path(key))
+        try:
+            os.remove(os.path.join(self.directory, STATS_FILE))
+        except OSError:
+            pass
+
+    def stats(self) -> dict:
+        """Entry count, total size and the hit/miss/eviction counters of all processes using the directory."""
+        entries = self.entries()
+        counters = self._read_counters()
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "directory": self.directory,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            **counters,
+            "hit_ratio": counters["hits"] / lookups if lookups else 0.0,
+        }
+
+    def _read_counters(self) -> dict:
+        counters = {"hits": 0, "misses": 0, "evictions": 0}
+        try:
+            with open(os.path.join(self.directory, STATS_FILE), "r", encoding="utf-8") as f:
+                counters.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+        return counters
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        # Best effort: concurrent processes may lose an increment, but never corrupt the file
+        counters = self._read_counters()
+        counters[name] += amount
+        try:
+            _atomic_write(os.path.join(self.directory, STATS_FILE), json.dumps(counters), sync=False)
+        except OSError:
+            pass
+
+
+def _atomic_write(path: str, text: str, sync: bool = True) -> None:
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+# Command line: python explorer_cache.py stats|clear|warm [--dir DIR] [--max-mb MB] [building.json ...]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or manage the Explorer precomputation cache.")
+    parser.add_argument("command", choices=["stats", "clear", "warm"])
+    parser.add_argument("buildings", nargs="*", help="building JSON files (warm only)")
+    parser.add_argument("--dir", default=DEFAULT_DIR)
+    parser.add_argument("--max-mb", type=float, default=DEFAULT_MAX_BYTES / 2**20)
+    args = parser.parse_args()
+    cache = ExplorerCache(args.dir, int(args.max_mb * 2**20))
+
+    if args.command == "stats":
+        for key, value in cache.stats().items():
+            print(f"{key:>10}: {value:.3f}" if isinstance(value, float) else f"{key:>10}: {value}")
+    elif args.command == "clear":
+        cache.clear()
+        print(f"Cleared {args.dir}")
+    else:
+        import time
+        from drawer import load_basic_floor
+        from explorer import Explorer
+        for building in args.buildings or ['Figure1_building_structure.json']:
+            graph = load_basic_floor(building)
+            t0 = time.perf_counter()
+            Explorer(graph, cache=cache)
+            print(f"{building}: {graph_fingerprint(graph)[:12]} ready in {(time.perf_counter() - t0) * 1e3:.2f} ms")
@@ -2,69 +2,105 @@ from location import Location, Room, RoomState
 from explorer import Explorer
 from person import Person
 import math
-from typing import Optional
+from typing import List, Optional, Tuple
 
 class Firefighter(Person):
-    location : Location = None
+    location_idx : Optional[int] = None
     expolorer_helper: Explorer = None
 
     def __init__(self, ID, velocity, explore_helper):
         super().__init__(ID, velocity)
         self.explorer_helper = explore_helper
         self.person_list = {}
+        # Time spent on all actions so far; used to look up time-dependent edge costs
+        self.clock = 0
+
+    @property
+    def location(self) -> Optional[Location]:
+        """The Location the firefighter stands on; the index in location_idx is the source of truth."""
+        if self.location_idx is None:
+            return None
+        return self.explorer_helper.graph.get_location(self.location_idx)
+
+    @location.setter
+    def location(self, location: Location) -> None:
+        self.location_idx = self.explorer_helper.graph.location_index(location)
 
     def setPos(self, label):
-        location = self.explorer_helper.get_location_by_label(label)
-        if not location or not isinstance(location, Location):
+        idx = self.explorer_helper.label_to_idx.get(label)
+        if idx is None:
             return 0, self.location.label
-        self.location  = location
+        self.location_idx = idx
 
     def max_velocity(self):        
         if len(self.person_list) == 0:
             return self.velocity
         return min(self.velocity, min(p.velocity for p in self.person_list.values()) or self.velocity)
-    
-    def moveTo(self, label):
-        t = 0
-        path_labels = [self.location.label]
-        
-        destination = self.explorer_helper.get_location_by_label(label)
-        if not destination or not isinstance(destination, Location):
-            return t, path_labels
 
-        if self.location == destination:
-            return t, path_labels
-
-        distance, path_labels = self.explorer_helper.get_path(self.location.label, label)
+    def _walk(self, u: int, v: int, depart: int) -> Tuple[Optional[int], List[int]]:
+        """
+        Returns (time, path_indices) for walking from u to v at the current max velocity.
+        Uses time-dependent edge costs at `depart` when the graph has any. time is None if unreachable.
+        """
+        if self.explorer_helper.graph.has_time_dependent_edges():
+            travel, path = self.explorer_helper.get_path_at_idx(u, v, depart, self.max_velocity())
+            if travel is None:
+                return None, path
+            return _ceil(travel), path
+        distance, path = self.explorer_helper.get_path_idx(u, v)
         if distance is None:
-            return 0, [self.location.label]
+            return None, path
+        return math.ceil(distance / self.max_velocity()), path
 
-        t += math.ceil(distance / self.max_velocity()) 
+    def _walk_to_nearest_exit(self, u: int, depart: int) -> Tuple[Optional[int], Optional[int], List[int]]:
+        """Returns (time, exit_idx, path_indices) like _walk, for the nearest exit."""
+        if self.explorer_helper.graph.has_time_dependent_edges():
+            travel, exit_idx, path = self.explorer_helper.find_nearest_exit_at_idx(u, depart, self.max_velocity())
+            if travel is None:
+                return None, None, path
+            return _ceil(travel), exit_idx, path
+        min_dist, exit_idx, path = self.explorer_helper.find_nearest_exit_idx(u)
+        if min_dist is None:
+            return None, None, path
+        return math.ceil(min_dist / self.max_velocity()), exit_idx, path
 
-        self.location = destination
-        
-        return t, path_labels
+    def _labels(self, path: List[int]) -> List[str]:
+        labels = self.explorer_helper.labels
+        return [labels[i] for i in path]
 
-    def exploreRoom(self, room_label: str) -> int:
-        t = 0
+    def _room(self, idx: Optional[int]) -> Optional[Location]:
+        return self.explorer_helper.graph.get_location(idx) if idx is not None else None
 
-        path_labels = [self.location.label]
-        room = self.explorer_helper.get_location_by_label(room_label)
-        if not room or not isinstance(room, Room):
-            return 0, path_labels
+    # --- Index-native actions: integer times and index paths, no label handling ---
+    # An index of None (an unknown label in the label API) is treated like a missing location.
+    def moveToIdx(self, idx: Optional[int]) -> Tuple[int, List[int]]:
+        if idx is None or self.location_idx == idx:
+            return 0, [self.location_idx]
 
-        if self.location == room:
-            return 0, self.location.label
+        walk, path = self._walk(self.location_idx, idx, self.clock)
+        if walk is None:
+            return 0, [self.location_idx]
+
+        self.location_idx = idx
+        self.clock += walk
+        return walk, path
+
+    def exploreRoomIdx(self, room_idx: Optional[int]) -> Tuple[int, List[int]]:
+        room = self._room(room_idx)
+        if not isinstance(room, Room):
+            return 0, [self.location_idx]
+
+        if self.location_idx == room_idx:
+            return 0, [self.location_idx]
         if room.state != RoomState.unknown:
-            return 0,  path_labels
+            return 0, [self.location_idx]
         
         # Move firefighter to the room if not already there
-        distance, path_labels = self.explorer_helper.get_path(self.location.label, room.label)
-        if distance is None:
-            return 0,  path_labels
+        walk, path = self._walk(self.location_idx, room_idx, self.clock)
+        if walk is None:
+            return 0, path
         
-        t = math.ceil(distance / self.max_velocity())
-        self.location = room        
+        self.location_idx = room_idx
             
         # Update room state after exploration
         if len(room.person_list) == 0:
@@ -72,79 +108,146 @@ class Firefighter(Person):
         else:
             room.state = RoomState.waiting
         
-        return  t + room.explore_time, path_labels
+        t = walk + room.explore_time
+        self.clock += t
+        return t, path
 
-    def rescueRoomToLocation(self, room_label: str, location_label: str) -> int:
-        path_labels = [self.location.label]
+    def rescueRoomToLocationIdx(self, room_idx: Optional[int], location_idx: Optional[int]) -> Tuple[int, List[int]]:
+        path = [self.location_idx]
         t = 0
-        room = self.explorer_helper.get_location_by_label(room_label)
-        if not room or not isinstance(room, Room) or room.state != RoomState.waiting:
+        room = self._room(room_idx)
+        if not isinstance(room, Room) or room.state != RoomState.waiting:
             print("Room isn't in waiting for reseue.")
-            return t, path_labels
-        
-        location =  self.explorer_helper.get_location_by_label(location_label)
-        if not location or not isinstance(location, Location):
-            return t, path_labels
+            return t, path
+        if location_idx is None:
+            return t, path
         
         # Move firefighter to the room if not already there
-        if self.location != room:
-            # explorer.get_path expects labels; accept Location or label
-            start_label = self.location.label if isinstance(self.location, Location) else self.location
-            room_label = room.label if isinstance(room, Location) else room
-            distance, path_labels = self.explorer_helper.get_path(start_label, room_label)
-            if distance is None:
-                return t, path_labels
-            t = math.ceil(distance / self.max_velocity())
-            self.location = room     
+        if self.location_idx != room_idx:
+            walk, path = self._walk(self.location_idx, room_idx, self.clock)
+            if walk is None:
+                return t, path
+            t = walk
+            self.location_idx = room_idx
         
-        if self.location == location:
-            return t, path_labels
+        if self.location_idx == location_idx:
+            self.clock += t
+            return t, path
         
-        start_label = self.location.label if isinstance(self.location, Location) else self.location
-        location_label = location.label if isinstance(location, Location) else location
-        distance, path_labels_2 = self.explorer_helper.get_path(start_label, location_label)
-        path_labels = path_labels + path_labels_2[1:]
-        t += math.ceil(distance / self.max_velocity())
+        walk, path_2 = self._walk(room_idx, location_idx, self.clock + t)
+        if walk is None:
+            self.clock += t
+            return t, path
+        path = path + path_2[1:]
+        t += walk
         self.person_list.update(room.person_list)
-        self.location = location
+        self.location_idx = location_idx
         room.person_list = {}
         room.state = RoomState.safe
 
-        return t, path_labels
+        self.clock += t
+        return t, path
 
-    def resecueRoomToNearestExit(self, room_label: str) -> int:
-        path_labels = [self.location.label]
+    def resecueRoomToNearestExitIdx(self, room_idx: Optional[int]) -> Tuple[int, List[int]]:
+        path = [self.location_idx]
         t = 0
-        room = self.explorer_helper.get_location_by_label(room_label)
-        if not room or not isinstance(room, Room) or room.state != RoomState.waiting:
+        room = self._room(room_idx)
+        if not isinstance(room, Room) or room.state != RoomState.waiting:
             print("Room isn't in waiting for reseue.")
-            return t, path_labels
+            return t, path
                 
         # Move firefighter to the room if not already there
-        if self.location != room:
-            # explorer.get_path expects labels; accept Location or label
-            start_label = self.location.label if isinstance(self.location, Location) else self.location
-            room_label = room.label if isinstance(room, Location) else room
-            distance, path_labels = self.explorer_helper.get_path(start_label, room_label)
-            if distance is None:
-                return t, path_labels
-            
-            t = math.ceil(distance / self.max_velocity())
-            self.location = room     
+        if self.location_idx != room_idx:
+            walk, path = self._walk(self.location_idx, room_idx, self.clock)
+            if walk is None:
+                return t, path
+            t = walk
+            self.location_idx = room_idx
         
-        min_dist, exit_label, path_labels_2 = self.explorer_helper.find_nearest_exit(room.label)
-        if min_dist is None:
-            return t, path_labels
-        t += math.ceil(min_dist / self.max_velocity()) 
-        path_labels =  path_labels + path_labels_2[1:]
+        walk, exit_idx, path_2 = self._walk_to_nearest_exit(room_idx, self.clock + t)
+        if walk is None:
+            self.clock += t
+            return t, path
+        t += walk 
+        path = path + path_2[1:]
         self.person_list.update(room.person_list)
-        self.location = self.explorer_helper.get_location_by_label(exit_label)
+        self.location_idx = exit_idx
         room.person_list = {}
         room.state = RoomState.safe
 
-        return t, path_labels
-    
+        self.clock += t
+        return t, path
+
+    # --- Label API: thin wrappers over the index-native actions ---
+    def moveTo(self, label):
+        t, path = self.moveToIdx(self.explorer_helper.label_to_idx.get(label))
+        return t, self._labels(path)
+
+    def exploreRoom(self, room_label: str) -> int:
+        t, path = self.exploreRoomIdx(self.explorer_helper.label_to_idx.get(room_label))
+        return t, self._labels(path)
+
+    def rescueRoomToLocation(self, room_label: str, location_label: str) -> int:
+        label_to_idx = self.explorer_helper.label_to_idx
+        t, path = self.rescueRoomToLocationIdx(label_to_idx.get(room_label), label_to_idx.get(location_label))
+        return t, self._labels(path)
+
+    def resecueRoomToNearestExit(self, room_label: str) -> int:
+        t, path = self.resecueRoomToNearestExitIdx(self.explorer_helper.label_to_idx.get(room_label))
+        return t, self._labels(path)
+
     def unload(self):
         if self.location and self.location.is_exit:
             self.person_list.clear()
-        return 0, [self.location.label]
\ No newline at end of file
+        return 0, [self.location.label]
+
+def _ceil(x: float) -> int:
+    """math.ceil that ignores float noise from summing per-edge travel times."""
+    return math.ceil(x - 1e-9)
+
+# Benchmark: python firefighter.py
+# Per-action cost of the label API against the index-native API on the Figure 1 building.
+if __name__ == "__main__":
+    import time
+    from drawer import load_basic_floor
+
+    graph = load_basic_floor('Figure1_building_structure.json')
+    explorer = Explorer(graph)
+    L = explorer.label_to_idx
+    rooms = [i for i in graph.vertices() if isinstance(graph.get_location(i), Room)]
+    n = 20000
+
+    def bench(name, fn):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn()
+        return name, (time.perf_counter() - t0) / n * 1e6
+
+    def reset():
+        for i in rooms:
+            graph.get_location(i).state = RoomState.unknown
+
+    def explore_labels():
+        reset()
+        for i in rooms:
+            ff.exploreRoom(explorer.labels[i])
+
+    def explore_idx():
+        reset()
+        for i in rooms:
+            ff.exploreRoomIdx(i)
+
+    ff = Firefighter(1, 5, explorer)
+    ff.setPos("EXIT_L")
+    results = [
+        (bench("Explorer.get_path", lambda: explorer.get_path("TL", "EXIT_R")),
+         bench("Explorer.get_path_idx", lambda: explorer.get_path_idx(L["TL"], L["EXIT_R"]))),
+        (bench("Explorer.find_nearest_exit", lambda: explorer.find_nearest_exit("TM")),
+         bench("Explorer.find_nearest_exit_idx", lambda: explorer.find_nearest_exit_idx(L["TM"]))),
+        (bench("Firefighter.moveTo x2", lambda: (ff.moveTo("EXIT_R"), ff.moveTo("EXIT_L"))),
+         bench("Firefighter.moveToIdx x2", lambda: (ff.moveToIdx(L["EXIT_R"]), ff.moveToIdx(L["EXIT_L"])))),
+        (bench(f"Firefighter.exploreRoom x{len(rooms)}", explore_labels),
+         bench(f"Firefighter.exploreRoomIdx x{len(rooms)}", explore_idx)),
+    ]
+    for (label_name, label_us), (idx_name, idx_us) in results:
+        print(f"{label_name:<34} {label_us:8.2f} us | {idx_name:<34} {idx_us:8.2f} us | speedup {label_us / idx_us:.2f}x")
@@ -1,6 +1,12 @@
-from typing import Dict, Iterable, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple, Union
 from location import Location
 
+if TYPE_CHECKING:
+    import networkx as nx
+    import numpy as np
+    import scipy.sparse
+    from timedep import TravelTimeProfile
+
 Index = int
 Edge = Tuple[Index, Index, int]
 
@@ -14,10 +20,18 @@ class Graph:
     Storage:
       - self.locations: List[Location]     - List of vertices, where the index is the vertex ID.
       - self._adj: Dict[int, Dict[int, int]]  - Adjacency list, storing integer weights.
+      - self._profiles: Dict[Tuple[int, int], TravelTimeProfile] - Optional time-dependent costs, keyed by (min(u, v), max(u, v)).
+      - self._version: int                 - Incremented on every mutation, so derived data can tell when it is stale.
+      - self._listeners: List[Callable]    - Called as listener(event, u, v, w) on "add_location", "add_edge" and "remove_edge".
+      - self._derived: Dict[str, Tuple[int, object]] - Conversions (edge arrays, CSR, NetworkX) and the _version they were built at.
     """
     def __init__(self, locations: Optional[Union[int, Iterable[Location]]] = None, E: Optional[Iterable[Tuple]] = None):
         self.locations: List[Location] = []
         self._adj: Dict[Index, Dict[Index, int]] = {}
+        self._profiles: Dict[Tuple[Index, Index], "TravelTimeProfile"] = {}
+        self._version: int = 0
+        self._listeners: List[Callable[[str, Index, Optional[Index], Optional[int]], None]] = []
+        self._derived: Dict[str, Tuple[int, object]] = {}
 
         if locations is None:
             pass
@@ -49,6 +63,9 @@ class Graph:
         self.locations.append(location)
         idx = len(self.locations) - 1
         self._adj.setdefault(idx, {})
+        self._version += 1
+        for listener in self._listeners:
+            listener("add_location", idx, None, None)
         return idx
 
     def get_location(self, idx: Index) -> Location:
@@ -76,14 +93,23 @@ class Graph:
         self._adj.setdefault(vi, {})
         self._adj[ui][vi] = int(weight)
         self._adj[vi][ui] = int(weight)
+        self._version += 1
+        for listener in self._listeners:
+            listener("add_edge", ui, vi, int(weight))
 
     def remove_edge(self, u: Union[Index, Location], v: Union[Index, Location]) -> None:
         ui = self.location_index(u) if not isinstance(u, int) else u
         vi = self.location_index(v) if not isinstance(v, int) else v
+        w = self._adj.get(ui, {}).get(vi)
         if ui in self._adj and vi in self._adj[ui]:
             del self._adj[ui][vi]
         if vi in self._adj and ui in self._adj[vi]:
             del self._adj[vi][ui]
+        self._profiles.pop((ui, vi) if ui <= vi else (vi, ui), None)
+        self._version += 1
+        if w is not None:
+            for listener in self._listeners:
+                listener("remove_edge", ui, vi, w)
 
     def has_edge(self, u: Union[Index, Location], v: Union[Index, Location]) -> bool:
         ui = self.location_index(u) if not isinstance(u, int) else u
@@ -100,6 +126,32 @@ class Graph:
         w = self._adj.get(ui, {}).get(vi)
         return int(w) if w is not None else None
 
+    def subscribe(self, listener: Callable[[str, Index, Optional[Index], Optional[int]], None]) -> None:
+        """Registers listener(event, u, v, w), called after every location/edge mutation."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[str, Index, Optional[Index], Optional[int]], None]) -> None:
+        self._listeners.remove(listener)
+
+    def set_edge_profile(self, u: Union[Index, Location], v: Union[Index, Location], profile: Optional["TravelTimeProfile"]) -> None:
+        """Attaches a time-dependent cost (timedep.TravelTimeProfile) to an existing edge; None restores the static weight."""
+        ui = self.location_index(u) if not isinstance(u, int) else u
+        vi = self.location_index(v) if not isinstance(v, int) else v
+        if not self.has_edge(ui, vi):
+            raise ValueError(f"No edge between {ui} and {vi}")
+        key = (ui, vi) if ui <= vi else (vi, ui)
+        if profile is None:
+            self._profiles.pop(key, None)
+        else:
+            self._profiles[key] = profile
+        self._version += 1
+
+    def edge_profile(self, u: Index, v: Index) -> Optional["TravelTimeProfile"]:
+        return self._profiles.get((u, v) if u <= v else (v, u))
+
+    def has_time_dependent_edges(self) -> bool:
+        return bool(self._profiles)
+
     # --- Queries ---
     def vertices(self) -> List[Index]:
         return list(range(len(self.locations)))
@@ -119,6 +171,93 @@ class Graph:
                 out.append((key[0], key[1], int(w)))
         return out
 
+    # --- Interop ---
+    def _cached(self, name: str, build: Callable[[], object]) -> object:
+        """Returns build(), reusing the previous result until the graph mutates."""
+        hit = self._derived.get(name)
+        if hit is not None and hit[0] == self._version:
+            return hit[1]
+        value = build()
+        self._derived[name] = (self._version, value)
+        return value
+
+    def edge_arrays(self) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """Returns (u, v, w) int64 arrays with one entry per undirected edge, u <= v. Cached; do not modify."""
+        def build():
+            import numpy as np
+            edges = self.edges()
+            if not edges:
+                empty = np.zeros(0, dtype=np.int64)
+                return empty, empty.copy(), empty.copy()
+            u, v, w = np.array(edges, dtype=np.int64).T
+            return u, v, w
+        return self._cached("edge_arrays", build)
+
+    def to_csr(self) -> "scipy.sparse.csr_matrix":
+        """
+        Returns the symmetric (n, n) weighted adjacency matrix as a scipy.sparse.csr_matrix, built
+        directly from edge_arrays(). Cached until the graph mutates; callers must not modify it.
+        """
+        def build():
+            import numpy as np
+            from scipy.sparse import csr_matrix
+            u, v, w = self.edge_arrays()
+            n = len(self.locations)
+            return csr_matrix((np.concatenate([w, w]), (np.concatenate([u, v]), np.concatenate([v, u]))), shape=(n, n))
+        return self._cached("csr", build)
+
+    def to_networkx(self) -> "nx.Graph":
+        """
+        Returns an nx.Graph with nodes 0..n-1 and integer "weight" edge attributes, filled with bulk
+        add_nodes_from / add_weighted_edges_from. Cached until the graph mutates; callers must not modify it.
+        """
+        def build():
+            import networkx as nx
+            G = nx.Graph()
+            G.add_nodes_from(range(len(self.locations)))
+            G.add_weighted_edges_from(self.edges())
+            return G
+        return self._cached("networkx", build)
+
+    @classmethod
+    def from_edge_arrays(cls, u: Iterable[int], v: Iterable[int], w: Iterable[int], locations: Optional[Iterable[Location]] = None, n: int = 0) -> "Graph":
+        """
+        Builds a graph from parallel edge arrays (duplicates keep the last weight).
+        Locations default to Location(str(i), False, False) for every index up to max(n, largest endpoint + 1).
+        """
+        g = cls(locations)
+        u, v, w = [int(x) for x in u], [int(x) for x in v], [int(x) for x in w]
+        size = max([n, len(g.locations)] + [x + 1 for x in u + v])
+        for i in range(len(g.locations), size):
+            g.add_location(Location(str(i), False, False))
+        adj = g._adj
+        for a, b, weight in zip(u, v, w):
+            adj[a][b] = weight
+            adj[b][a] = weight
+        g._version += 1
+        return g
+
+    @classmethod
+    def from_csr(cls, matrix: "scipy.sparse.spmatrix", locations: Optional[Iterable[Location]] = None) -> "Graph":
+        """Builds a graph from a symmetric sparse adjacency matrix (the upper triangle is read; weights are cast to int)."""
+        from scipy.sparse import triu
+        upper = triu(matrix, k=1).tocoo()
+        return cls.from_edge_arrays(upper.row, upper.col, upper.data, locations, n=matrix.shape[0])
+
+    @classmethod
+    def from_networkx(cls, G: "nx.Graph", locations: Optional[Iterable[Location]] = None, weight: str = "weight") -> "Graph":
+        """
+        Builds a graph from an nx.Graph. Nodes are numbered in G.nodes order; a node's "location"
+        attribute is used as its Location when locations is not given. Missing weights default to 1.
+        """
+        nodes = list(G.nodes)
+        index = {node: i for i, node in enumerate(nodes)}
+        if locations is None:
+            locations = [G.nodes[node].get("location") or Location(str(node), False, False) for node in nodes]
+        edges = [(index[a], index[b], data.get(weight, 1)) for a, b, data in G.edges(data=True)]
+        u, v, w = zip(*edges) if edges else ((), (), ())
+        return cls.from_edge_arrays(u, v, w, locations, n=len(nodes))
+
     def degree(self, v: Union[Index, Location]) -> int:
         vi = self.location_index(v) if not isinstance(v, int) else v
         return len(self._adj.get(vi, {}))
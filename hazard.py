@@ -0,0 +1,204 @@
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import numpy as np
+import scipy.sparse as sp
+from graph import Graph
+
+class HazardModel:
+    """
+    Fire and smoke spread over the building graph as a vectorized cellular process.
+    Each location holds a fire and a smoke intensity in [0, 1]. One tick is two sparse
+    matrix-vector products with the row-normalized adjacency P (edge conductance = 1 / weight,
+    so long corridors carry less) plus in-place elementwise updates:
+      - fire  += dt * (fire_spread * (P @ fire) + fire_growth * fire) * (1 - fire)
+      - smoke += dt * (smoke_spread * (P @ smoke - smoke) + smoke_production * fire - smoke_decay * smoke)
+    A location becomes impassable once fire >= fire_threshold or smoke >= smoke_threshold.
+    Storage:
+      - self.state: np.ndarray (2, n) float32 - Row 0 is fire, row 1 is smoke, indexed by location index.
+        Kept as two rows because scipy's CSR kernel runs two SpMVs in about half the time of one
+        (n, 2) SpMM (1.0 vs 2.0 ms on 100k locations).
+      - self.blocked: np.ndarray (n,) - True for impassable locations, updated once per step() call.
+    The spread matrix is built once from the graph passed in, so edges closed by the hazard
+    itself keep conducting fire and smoke.
+    Throughput (python hazard.py, one core): about 450-600 ticks/s on 100k locations, short of the
+    thousands per second wanted. The two SpMVs alone take ~2 ms there and the elementwise passes
+    are noise next to them, so more fusing would not close the gap; thousands of ticks/s are
+    reached on ~10k-location buildings.
+    """
+    def __init__(self, graph: Graph, dt: float = 1.0,
+                 fire_spread: float = 0.05, fire_growth: float = 0.1,
+                 smoke_spread: float = 0.3, smoke_production: float = 0.2, smoke_decay: float = 0.01,
+                 fire_threshold: float = 0.5, smoke_threshold: float = 0.8):
+        self.graph = graph
+        self.dt = dt
+        self.fire_spread = fire_spread
+        self.fire_growth = fire_growth
+        self.smoke_spread = smoke_spread
+        self.smoke_production = smoke_production
+        self.smoke_decay = smoke_decay
+        self.fire_threshold = fire_threshold
+        self.smoke_threshold = smoke_threshold
+
+        n = len(graph)
+        self.P = _spread_matrix(graph)
+        self._fire_P = self.P * np.float32(dt * fire_spread)
+        self._smoke_P = self.P * np.float32(dt * smoke_spread)
+        self.state = np.zeros((2, n), dtype=np.float32)
+        self._buf = np.empty(n, dtype=np.float32)
+        self.blocked = np.zeros(n, dtype=bool)
+        self.time = 0.0
+        # Edges removed from the graph because an endpoint is blocked: (u, v) -> (weight, profile)
+        self._closed: Dict[Tuple[int, int], Tuple[int, object]] = {}
+        self._explorers: List = []
+        self._callbacks: List[Callable[[np.ndarray, np.ndarray], None]] = []
+
+    @property
+    def fire(self) -> np.ndarray:
+        return self.state[0]
+
+    @property
+    def smoke(self) -> np.ndarray:
+        return self.state[1]
+
+    def ignite(self, location: Union[int, str], intensity: float = 1.0, explorer=None) -> None:
+        """Sets the fire intensity of a location, given by index or (with an explorer) by label."""
+        idx = explorer.label_to_idx[location] if isinstance(location, str) else location
+        self.state[0, idx] = max(self.state[0, idx], intensity)
+
+    # --- Consumers of passability changes ---
+    def attach(self, explorer) -> None:
+        """
+        Removes/restores edges of blocked locations in explorer.graph on every change and passes them to
+        explorer.edges_changed, which recomputes the paths at most once per tick (only if a closed edge
+        was on some shortest path) and relaxes reopened edges incrementally.
+        """
+        self._explorers.append(explorer)
+
+    def on_change(self, callback: Callable[[np.ndarray, np.ndarray], None]) -> None:
+        """Registers callback(newly_blocked, newly_cleared), called with index arrays after a tick that changed passability."""
+        self._callbacks.append(callback)
+
+    # --- Simulation ---
+    def step(self, ticks: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Advances the model by `ticks` ticks. Returns (newly_blocked, newly_cleared) index arrays
+        relative to the state before the call; attached explorers and callbacks are notified once.
+        """
+        fire_P, smoke_P = self._fire_P, self._smoke_P
+        fire, smoke = self.state
+        tmp = self._buf
+        dt = self.dt
+        fg, sp_ = dt * self.fire_growth, dt * self.smoke_production
+        sd = 1.0 - dt * (self.smoke_spread + self.smoke_decay)
+        for _ in range(ticks):
+            # df = (fs * P@fire + fg * fire) * (1 - fire); the SpMV result is the accumulator
+            df = fire_P @ fire
+            df += np.multiply(fire, fg, out=tmp)
+            df *= np.subtract(1.0, fire, out=tmp)
+            # smoke = ss * P@smoke + sd * smoke + sp * fire   (uses fire before this tick's update)
+            new_smoke = smoke_P @ smoke
+            new_smoke += np.multiply(smoke, sd, out=tmp)
+            new_smoke += np.multiply(fire, sp_, out=tmp)
+            fire += df
+            np.clip(fire, 0.0, 1.0, out=fire)
+            np.clip(new_smoke, 0.0, 1.0, out=smoke)
+        self.time += ticks * dt
+
+        blocked = fire >= self.fire_threshold
+        blocked |= smoke >= self.smoke_threshold
+        changed = np.flatnonzero(blocked != self.blocked)
+        newly_blocked = changed[blocked[changed]]
+        newly_cleared = changed[~blocked[changed]]
+        self.blocked = blocked
+        if len(changed):
+            self._notify(newly_blocked, newly_cleared)
+        return newly_blocked, newly_cleared
+
+    def is_blocked(self, idx: int) -> bool:
+        return bool(self.blocked[idx])
+
+    def release(self) -> None:
+        """Reopens every edge the model closed, passes them to the attached explorers and detaches them."""
+        cleared = np.flatnonzero(self.blocked)
+        self.blocked = np.zeros_like(self.blocked)
+        if self._explorers and len(cleared):
+            changes = self._update_graph(np.zeros(0, dtype=np.int64), cleared)
+            for explorer in self._explorers:
+                explorer.edges_changed(changes)
+        self._explorers = []
+
+    def _notify(self, newly_blocked: np.ndarray, newly_cleared: np.ndarray) -> None:
+        if self._explorers:
+            changes = self._update_graph(newly_blocked, newly_cleared)
+            for explorer in self._explorers:
+                explorer.edges_changed(changes)
+        for callback in self._callbacks:
+            callback(newly_blocked, newly_cleared)
+
+    def _update_graph(self, newly_blocked: np.ndarray, newly_cleared: np.ndarray) -> List[Tuple[int, int, Optional[int], Optional[int]]]:
+        """
+        Closes every edge touching a blocked location and reopens edges whose endpoints are both clear.
+        Returns the changes as (u, v, old weight, new weight), None for a closed edge.
+        """
+        g = self.graph
+        changes = []
+        for u in newly_blocked.tolist():
+            for v in g.neighbors(u):
+                key = (u, v) if u <= v else (v, u)
+                w = g.weight(u, v)
+                self._closed[key] = (w, g.edge_profile(u, v))
+                g.remove_edge(u, v)
+                changes.append((u, v, w, None))
+        if len(newly_cleared):
+            for key in [k for k in self._closed if not (self.blocked[k[0]] or self.blocked[k[1]])]:
+                w, profile = self._closed.pop(key)
+                g.add_edge(key[0], key[1], weight=w)
+                if profile is not None:
+                    g.set_edge_profile(key[0], key[1], profile)
+                changes.append((key[0], key[1], None, w))
+        return changes
+
+
+def _spread_matrix(graph: Graph) -> sp.csr_matrix:
+    """Row-normalized conductance matrix: P[u, v] = (1 / w_uv) / sum_x (1 / w_ux)."""
+    n = len(graph)
+    edges = graph.edges()
+    if not edges:
+        return sp.csr_matrix((n, n), dtype=np.float32)
+    arr = np.array(edges, dtype=np.int64)
+    u, v = arr[:, 0], arr[:, 1]
+    c = 1.0 / np.maximum(arr[:, 2], 1)
+    rows = np.concatenate([u, v])
+    cols = np.concatenate([v, u])
+    vals = np.concatenate([c, c])
+    P = sp.csr_matrix((vals, (rows, cols)), shape=(n, n))
+    row_sum = np.asarray(P.sum(axis=1)).ravel()
+    row_sum[row_sum == 0] = 1.0
+    return (sp.diags(1.0 / row_sum) @ P).tocsr().astype(np.float32)
+
+# Example / benchmark: python hazard.py
+if __name__ == "__main__":
+    import time
+    from drawer import load_basic_floor
+    from explorer import Explorer
+    from landmarks import grid_graph
+
+    graph = load_basic_floor('Figure1_building_structure.json')
+    explorer = Explorer(graph)
+    hazard = HazardModel(graph)
+    hazard.attach(explorer)
+    hazard.on_change(lambda b, c: print(f"  t={hazard.time:>4.0f} blocked: {[explorer.labels[i] for i in b]} cleared: {[explorer.labels[i] for i in c]}"))
+    hazard.ignite("BM", explorer=explorer)
+    print("Fire starts in BM")
+    for _ in range(30):
+        hazard.step()
+    print("Nearest exit from TL after 30 ticks:", explorer.find_nearest_exit("TL"))
+
+    side = 316
+    big = grid_graph(side, side)
+    model = HazardModel(big)
+    model.ignite(0)
+    ticks = 1000
+    t0 = time.perf_counter()
+    model.step(ticks)
+    elapsed = time.perf_counter() - t0
+    print(f"\n{len(big)} locations: {ticks / elapsed:.0f} ticks/s")
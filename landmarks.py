@@ -0,0 +1,263 @@
+import json
+import sys
+from array import array
+from heapq import heappush, heappop
+from operator import sub
+from typing import Iterable, List, Optional, Tuple
+from explorer_cache import graph_fingerprint
+from graph import Graph
+
+INF = 10**9  # Same sentinel as explorer.INF
+
+MAGIC = "himcm-alt-v2"
+
+class LandmarkIndex:
+    """
+    Point-to-point shortest path index using A* with landmark lower bounds (ALT).
+    Preprocessing runs one Dijkstra per landmark; a query then runs A* guided by the
+    triangle-inequality bound |d(L, t) - d(L, v)| maximised over all landmarks.
+    Storage:
+      - self.landmarks: List[int]   - Landmark vertex indices.
+      - self.table: array('q')      - Landmark distances, node-major: table[v * L + i] = d(landmarks[i], v).
+    Use it as an Explorer backend for graphs where the dense Floyd-Warshall tables do not fit:
+      Explorer(graph, backend=LandmarkIndex.build(graph))
+    Performance: this does NOT meet the sub-millisecond target for ~1M locations. Preprocessing is
+    compiled (csgraph Dijkstra), but the A* loop is pure Python at a few microseconds per settled
+    vertex, so query time grows with the area searched. Measured with python landmarks.py 1000
+    (1M-location grid, 16 landmarks): 12 s to build, about 1.5 ms per local (<= 10 hops) query and
+    200 ms per random pair. On a 300x300 grid: 1.4 ms local, 20 ms random. Sub-millisecond random
+    queries at that size need a hierarchical index (e.g. contraction hierarchies), which is not built.
+    """
+    def __init__(self, graph: Graph, landmarks: List[int], table: array):
+        self.graph = graph
+        self.landmarks = list(landmarks)
+        self.table = table
+
+    # --- Construction ---
+    @classmethod
+    def build(cls, graph: Graph, num_landmarks: int = 8) -> "LandmarkIndex":
+        """
+        Selects landmarks by farthest-point sampling and stores their distances to every vertex.
+        Each landmark costs one scipy.sparse.csgraph.dijkstra over graph.to_csr().
+        Unreachable vertices keep INF, which the lower bound treats as "no information".
+        """
+        import numpy as np
+        from scipy.sparse.csgraph import dijkstra
+        n = len(graph)
+        num_landmarks = max(0, min(num_landmarks, n))
+        csr = graph.to_csr()
+        landmarks: List[int] = []
+        rows = []
+        # Distance from the nearest chosen landmark; the next landmark is the vertex farthest away
+        closest = np.full(n, np.inf)
+        candidate = 0
+        for _ in range(num_landmarks):
+            dist = dijkstra(csr, directed=False, indices=candidate)
+            landmarks.append(candidate)
+            rows.append(dist)
+            np.minimum(closest, dist, out=closest)
+            # Vertices never reached score inf, so every component gets a landmark
+            score = closest.copy()
+            score[landmarks] = -1
+            candidate = int(np.argmax(score)) if n else -1
+            if candidate == -1 or score[candidate] < 0:
+                break
+
+        L = len(landmarks)
+        if L == 0:
+            return cls(graph, landmarks, array("q"))
+        dist = np.stack(rows, axis=1)
+        table = array("q")
+        table.frombytes(np.where(np.isinf(dist), INF, dist).astype(np.int64).tobytes())
+        return cls(graph, landmarks, table)
+
+    def rebuild(self) -> "LandmarkIndex":
+        """Returns a new index over the current graph with as many landmarks, e.g. after an edge got shorter."""
+        return type(self).build(self.graph, len(self.landmarks))
+
+    # --- Persistence ---
+    def save(self, filepath: str) -> None:
+        """
+        Writes the index as a one-line JSON header followed by the raw distance table.
+        The header records the graph's fingerprint (explorer_cache.graph_fingerprint: labels, edges and
+        weights) so that an index built for any other graph is rejected on load.
+        """
+        header = {
+            "magic": MAGIC,
+            "n": len(self.graph),
+            "fingerprint": graph_fingerprint(self.graph),
+            "landmarks": self.landmarks,
+            "byteorder": sys.byteorder,
+        }
+        with open(filepath, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            self.table.tofile(f)
+
+    @classmethod
+    def load(cls, graph: Graph, filepath: str) -> "LandmarkIndex":
+        """Loads an index written by save(). Raises ValueError if it was built for a different graph."""
+        with open(filepath, "rb") as f:
+            header = json.loads(f.readline().decode("utf-8"))
+            if header.get("magic") != MAGIC:
+                raise ValueError(f"{filepath} is not a landmark index file")
+            if header["n"] != len(graph) or header["fingerprint"] != graph_fingerprint(graph):
+                raise ValueError(f"Landmark index {filepath} was built for a different graph")
+            table = array("q")
+            table.fromfile(f, header["n"] * len(header["landmarks"]))
+        if header["byteorder"] != sys.byteorder:
+            table.byteswap()
+        return cls(graph, header["landmarks"], table)
+
+    # --- Queries ---
+    def lower_bound(self, u: int, v: int) -> int:
+        """Returns an admissible lower bound on d(u, v) from the landmark table."""
+        L = len(self.landmarks)
+        table = self.table
+        bu = u * L
+        bv = v * L
+        best = 0
+        for i in range(L):
+            du = table[bu + i]
+            dv = table[bv + i]
+            if du == INF or dv == INF:
+                continue
+            diff = du - dv if du > dv else dv - du
+            if diff > best:
+                best = diff
+        return best
+
+    def query(self, u: int, v: int) -> Tuple[Optional[int], List[int]]:
+        """
+        Computes the shortest distance and path (as node indices) from u to v with A*.
+        Returns (None, []) if v is not reachable from u.
+        """
+        if u == v:
+            return 0, [u]
+        L = len(self.landmarks)
+        table = self.table
+        adj = self.graph._adj
+        target = table[v * L:v * L + L]
+        if any(table[u * L + i] == INF and target[i] != INF for i in range(L)):
+            # Some landmark reaches v but not u: different components
+            return None, []
+
+        # h(y) = max |d(L, y) - d(L, v)| over all landmarks, computed once per vertex. INF needs no
+        # special case: a landmark that misses v also misses every vertex that can still reach v
+        # (INF - INF = 0), and a vertex it reaches but v does not can never lead to v.
+        # Stale heap entries are skipped by comparing against g instead of keeping a closed set,
+        # so vertices can be reopened and the search stays exact when edges have been removed
+        # since the index was built (the bound is then admissible but no longer consistent).
+        g = {u: 0}
+        parent = {u: u}
+        h = {}
+        heap = [(0, 0, u)]
+        while heap:
+            _, gx, x = heappop(heap)
+            if gx > g[x]:
+                continue
+            if x == v:
+                return gx, _unwind(parent, u, v)
+            for y, w in adj[x].items():
+                gy = gx + w
+                if gy < g.get(y, INF):
+                    g[y] = gy
+                    parent[y] = x
+                    hy = h.get(y)
+                    if hy is None:
+                        base = y * L
+                        hy = h[y] = max(map(abs, map(sub, table[base:base + L], target)))
+                    heappush(heap, (gy + hy, gy, y))
+        return None, []
+
+    def nearest(self, u: int, targets: Iterable[int]) -> Tuple[Optional[int], Optional[int], List[int]]:
+        """
+        Finds the closest of several targets (e.g. exits) from u.
+        Targets are tried in order of their lower bound, and the search stops as soon as
+        the next bound cannot beat the best distance found so far.
+        Returns (distance, target, path) or (None, None, []).
+        """
+        order = sorted((self.lower_bound(u, t), t) for t in targets)
+        best_dist: Optional[int] = None
+        best_target: Optional[int] = None
+        best_path: List[int] = []
+        for lb, t in order:
+            if best_dist is not None and lb >= best_dist:
+                break
+            d, path = self.query(u, t)
+            if d is not None and (best_dist is None or d < best_dist):
+                best_dist, best_target, best_path = d, t, path
+        return best_dist, best_target, best_path
+
+
+def _unwind(parent: dict, u: int, v: int) -> List[int]:
+    path = [v]
+    while v != u:
+        v = parent[v]
+        path.append(v)
+    path.reverse()
+    return path
+
+def grid_graph(rows: int, cols: int, seed: int = 0) -> Graph:
+    """Builds a rows x cols corridor grid with random integer weights, used by the benchmark below."""
+    from random import Random
+    from location import Location
+    rnd = Random(seed)
+    g = Graph()
+    for r in range(rows):
+        for c in range(cols):
+            g.add_location(Location(f"{r}_{c}", False, True))
+    for r in range(rows):
+        for c in range(cols):
+            i = r * cols + c
+            if c + 1 < cols:
+                g.add_edge(i, i + 1, weight=rnd.randint(1, 9))
+            if r + 1 < rows:
+                g.add_edge(i, i + cols, weight=rnd.randint(1, 9))
+    return g
+
+# Benchmark: python landmarks.py [side]
+# Compares ALT queries against Floyd-Warshall on a small grid, then times queries on a side x side grid.
+if __name__ == "__main__":
+    import time
+    from random import Random
+    from explorer import Explorer
+
+    rnd = Random(1)
+
+    print("--- ALT vs Floyd-Warshall (15x15 grid) ---")
+    g = grid_graph(15, 15)
+    t0 = time.perf_counter()
+    fw = Explorer(g)
+    t_fw = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    index = LandmarkIndex.build(g)
+    t_build = time.perf_counter() - t0
+    pairs = [(rnd.randrange(len(g)), rnd.randrange(len(g))) for _ in range(1000)]
+    t0 = time.perf_counter()
+    for u, v in pairs:
+        d, _ = index.query(u, v)
+        assert d == fw.dist[u][v], (u, v, d, fw.dist[u][v])
+    t_alt = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for u, v in pairs:
+        fw.reconstruct_path(u, v)
+    t_table = time.perf_counter() - t0
+    print(f"Floyd-Warshall precompute: {t_fw * 1e3:.1f} ms, table query: {t_table / len(pairs) * 1e6:.1f} us")
+    print(f"ALT precompute: {t_build * 1e3:.1f} ms, A* query: {t_alt / len(pairs) * 1e6:.1f} us (distances match)")
+
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    print(f"\n--- ALT on {side}x{side} grid ({side * side} locations) ---")
+    g = grid_graph(side, side)
+    t0 = time.perf_counter()
+    index = LandmarkIndex.build(g, num_landmarks=16)
+    print(f"ALT precompute: {time.perf_counter() - t0:.1f} s")
+    pairs = [(rnd.randrange(len(g)), rnd.randrange(len(g))) for _ in range(200)]
+    for label, hop in (("local (<= 10 hops)", 10), ("random pairs", None)):
+        if hop is not None:
+            qs = [(u, min(len(g) - 1, u + rnd.randrange(hop))) for u, _ in pairs]
+        else:
+            qs = pairs
+        t0 = time.perf_counter()
+        for u, v in qs:
+            index.query(u, v)
+        print(f"{label}: {(time.perf_counter() - t0) / len(qs) * 1e3:.3f} ms/query")
@@ -13,12 +13,29 @@ class Location:
     is_exit: bool = False
     is_hallway: bool = False    
     label: str = ""
+    # Set by session.BuildingState.bind: mutable state then lives in the state's arrays at index _idx
+    _store = None
+    _idx: int = -1
+
     def __init__(self, label: str, is_exit: bool,  is_hallway: bool):
         self.is_exit = is_exit
         self.is_hallway = is_hallway
         self.label = label
         self.person_list = {}
 
+    @property
+    def person_list(self) -> dict:
+        if self._store is None:
+            return self._person_list
+        return self._store.person_lists[self._idx]
+
+    @person_list.setter
+    def person_list(self, value: dict) -> None:
+        if self._store is None:
+            self._person_list = value
+        else:
+            self._store.set_person_list(self._idx, value)
+
     def get_max_velocity(self) -> Optional[int]:
         """Returns the minimum velocity of people in the location, or None if empty."""
         if not self.person_list:
@@ -28,7 +45,7 @@ class Location:
 class Room(Location):
     """Represents a Room with a number of people and an exploration time (in seconds)."""
     explore_time: int = 1 # Default exploration time is 1 (time unit)
-    state: RoomState = RoomState.unknown
+    _state: RoomState = RoomState.unknown
     size: int = 1
 
     def __init__(self, label: str, is_exit: bool,  is_hallway: bool, size : int, explore_time : int, person_list: dict):
@@ -42,6 +59,19 @@ class Room(Location):
         else:
             self.state = RoomState.unknown
 
+    @property
+    def state(self) -> RoomState:
+        if self._store is None:
+            return self._state
+        return self._store.get_room_state(self._idx)
+
+    @state.setter
+    def state(self, value: RoomState) -> None:
+        if self._store is None:
+            self._state = value
+        else:
+            self._store.set_room_state(self._idx, value)
+
 class Edge():
     u: Location
     v: Location
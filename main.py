@@ -3,6 +3,7 @@ from explorer import *
 from firefighter import Firefighter
 from collections import deque
 from heapq import heappush, heappop
+from evacuation import SelfEvacuation
 
 def test():
     graph = load_basic_floor('Figure1_building_structure.json')
@@ -59,17 +60,77 @@ def test():
 
     draw_with_pyvis(graph, path_labels)
     
-def rescue_building_1FF() -> int:
+def _room_evacuated(evacuation, room, now) -> bool:
+    """Advances self-evacuation to `now`; if everyone has walked out of the waiting room, marks it safe."""
+    if evacuation is None:
+        return False
+    evacuation.advance_to(now)
+    if room.person_list:
+        return False
+    room.state = RoomState.safe
+    return True
+
+def _start_hazard(graph, explore_helper, ignite):
+    """Returns a hazard.HazardModel burning from the `ignite` labels that reroutes explore_helper, or None."""
+    if not ignite:
+        return None
+    from hazard import HazardModel
+    hazard = HazardModel(graph)
+    hazard.attach(explore_helper)
+    for label in ignite:
+        hazard.ignite(label, explorer=explore_helper)
+    return hazard
+
+def _advance_hazard(hazard, now) -> None:
+    """Steps the hazard to `now`, so locations it has blocked are routed around from then on."""
+    if hazard is None:
+        return
+    ticks = int((now - hazard.time) // hazard.dt)
+    if ticks > 0:
+        hazard.step(ticks)
+
+def _blocked(hazard, idx) -> bool:
+    return hazard is not None and hazard.is_blocked(idx)
+
+def firefighter_setup(graph, scheduler: str):
+    """
+    Returns (velocities, start_labels) of the firefighters rescue_building_1FF ("1FF") or
+    rescue_building_2FF ("2FF") deploys on `graph`. 2FF starts at the first two exits in index
+    order (both at the only exit if there is one); start_labels is empty if there is none.
+    """
+    if scheduler == "1FF":
+        return [5], ["EXIT_R"]
+    exit_labels = [graph.get_location(i).label for i in range(len(graph)) if getattr(graph.get_location(i), 'is_exit', False)]
+    if not exit_labels:
+        return [5, 5], []
+    # assign starting exits (duplicate if only one)
+    return [5, 5], (exit_labels * 2)[:2]
+
+def rescue_building_1FF(session=None, self_evacuation_velocity=None, ignite=None) -> int:
+    """
+    Runs the scenario on a freshly loaded building, or on `session` (a session.BuildingSession) after resetting it.
+    With self_evacuation_velocity, occupants at least that fast walk to the nearest exit on their own
+    (evacuation.SelfEvacuation, advanced to the acting firefighter's clock) and emptied rooms need no rescue.
+    With ignite (location labels), fire and smoke spread from there (hazard.HazardModel, advanced to the
+    acting firefighter's clock); blocked locations are routed around and reopened when the run ends.
+    """
     total_time = 0
-    graph = load_basic_floor('Figure1_building_structure.json')
-    #print_graph_cli(graph)
+    if session is None:
+        graph = load_basic_floor('Figure1_building_structure.json')
+        #print_graph_cli(graph)
 
-    explore_helper = Explorer(graph)    
-    firefighter = Firefighter(100, 5, explore_helper)
-    firefighter.setPos("EXIT_R")
+        explore_helper = Explorer(graph)    
+    else:
+        session.reset()
+        graph, explore_helper = session.graph, session.explorer
+    evacuation = SelfEvacuation(graph, self_evacuation_velocity) if self_evacuation_velocity is not None else None
+    hazard = _start_hazard(graph, explore_helper, ignite)
+    velocities, start_labels = firefighter_setup(graph, "1FF")
+    firefighter = Firefighter(100, velocities[0], explore_helper)
+    firefighter.setPos(start_labels[0])
 
     # Phase 1: BFS exploration (discover rooms). Collect rooms that need rescue.
-    start_label = "EXIT_R"
+    start_label = start_labels[0]
     start_idx = explore_helper.label_to_idx.get(start_label)
     path = [start_label]
 
@@ -90,7 +151,12 @@ def rescue_building_1FF() -> int:
         loc = graph.get_location(idx)
 
         # If it's a room and unknown, explore it
-        if isinstance(loc, Room) and loc.state == RoomState.unknown:
+        if evacuation is not None:
+            evacuation.advance_to(total_time)
+        _advance_hazard(hazard, total_time)
+        if isinstance(loc, Room) and _blocked(hazard, idx):
+            print(f"\tRoom {loc.label} is blocked by fire or smoke")
+        elif isinstance(loc, Room) and loc.state == RoomState.unknown:
             t, path_labels = firefighter.exploreRoom(loc.label)
             total_time += t
             if path_labels:
@@ -109,6 +175,13 @@ def rescue_building_1FF() -> int:
     # Phase 2: Perform rescues for all waiting rooms discovered in phase 1
     print("Perform rescues for all waiting rooms discovered in phase 1")
     for room_label in waiting_rooms:
+        if _room_evacuated(evacuation, explore_helper.get_location_by_label(room_label), total_time):
+            print(f"\tRoom {room_label} evacuated itself by time {total_time}")
+            continue
+        _advance_hazard(hazard, total_time)
+        if _blocked(hazard, explore_helper.label_to_idx[room_label]):
+            print(f"\tRoom {room_label} is blocked by fire or smoke")
+            continue
         t, path_labels = firefighter.resecueRoomToNearestExit(room_label)
         firefighter.unload()
         total_time += t
@@ -117,29 +190,39 @@ def rescue_building_1FF() -> int:
     
     # draw_with_pyvis(graph, path)
 
+    if hazard is not None:
+        hazard.release()
     return total_time
 
-def rescue_building_2FF() -> int:
+def rescue_building_2FF(session=None, self_evacuation_velocity=None, ignite=None) -> int:
+    """
+    Runs the scenario on a freshly loaded building, or on `session` (a session.BuildingSession) after resetting it.
+    With self_evacuation_velocity, occupants at least that fast walk to the nearest exit on their own
+    (evacuation.SelfEvacuation, advanced to the acting firefighter's clock) and emptied rooms need no rescue.
+    With ignite (location labels), fire and smoke spread from there (hazard.HazardModel, advanced to the
+    acting firefighter's clock); blocked locations are routed around and reopened when the run ends.
+    """
     total_time = 0
-    graph = load_basic_floor('Figure1_building_structure.json')
-    #print_graph_cli(graph)
+    if session is None:
+        graph = load_basic_floor('Figure1_building_structure.json')
+        #print_graph_cli(graph)
 
-    explore_helper = Explorer(graph)    
+        explore_helper = Explorer(graph)    
+    else:
+        session.reset()
+        graph, explore_helper = session.graph, session.explorer
+    evacuation = SelfEvacuation(graph, self_evacuation_velocity) if self_evacuation_velocity is not None else None
+    hazard = _start_hazard(graph, explore_helper, ignite)
     # prepare two firefighters (indexes 0 and 1)
-    firefighters = [Firefighter(1, 5, explore_helper), Firefighter(2, 5, explore_helper)]
+    velocities, start_labels = firefighter_setup(graph, "2FF")
+    firefighters = [Firefighter(1, velocities[0], explore_helper), Firefighter(2, velocities[1], explore_helper)]
 
-    # find exit labels
-    exit_labels = [graph.get_location(i).label for i in range(len(graph)) if getattr(graph.get_location(i), 'is_exit', False)]
-    if not exit_labels:
+    if not start_labels:
         print("No exits found; aborting")
+        if hazard is not None:
+            hazard.release()
         return 0
 
-    # assign starting exits (duplicate if only one)
-    if len(exit_labels) == 1:
-        start_labels = [exit_labels[0], exit_labels[0]]
-    else:
-        start_labels = [exit_labels[0], exit_labels[1]]
-
     firefighters[0].setPos(start_labels[0])
     firefighters[1].setPos(start_labels[1])
 
@@ -205,6 +288,13 @@ def rescue_building_2FF() -> int:
                 queues[fi].append(nbr)
 
         # If it's a room and unknown -> explore
+        if evacuation is not None:
+            evacuation.advance_to(cur_time)
+        _advance_hazard(hazard, cur_time)
+        if isinstance(loc, Room) and _blocked(hazard, target_idx):
+            print(f"\tRoom {loc.label} is blocked by fire or smoke")
+            heappush(heap, (cur_time, fi))
+            continue
         if isinstance(loc, Room) and loc.state == RoomState.unknown:
             t, path_labels = f.exploreRoom(loc.label)
             if t is None:
@@ -214,6 +304,8 @@ def rescue_building_2FF() -> int:
             print(f"\tFirefighter {fi+1} explored room {loc.label} in time {t}. Path: {' -> '.join(path_labels)}")
 
         # If it's waiting -> rescue to nearest exit
+        if isinstance(loc, Room) and loc.state == RoomState.waiting and _room_evacuated(evacuation, loc, cur_time):
+            print(f"\tRoom {loc.label} evacuated itself by time {cur_time}")
         if isinstance(loc, Room) and loc.state == RoomState.waiting:
             t2, path_labels2 = f.resecueRoomToNearestExit(loc.label)
             if t2 is None:
@@ -231,15 +323,32 @@ def rescue_building_2FF() -> int:
     # Optionally draw final graph (omitted path)
     # draw_with_pyvis(graph)
 
+    if hazard is not None:
+        hazard.release()
     return total_time
 
 if __name__ == "__main__":
+    from bounds import RescueBounds
+    from costtable import CostTable
     test()
 
+    graph = load_basic_floor('Figure1_building_structure.json')
+    table = CostTable(Explorer(graph))
+    bounds = RescueBounds(table)
+
+    def lower_bound(scheduler: str) -> int:
+        # Same firefighters as the scheduler deploys; the fastest one's velocity keeps the bound valid
+        velocities, start_labels = firefighter_setup(graph, scheduler)
+        return bounds.evaluate(table.idx(start_labels), max(velocities), k=len(velocities))['bound']
+
     print("Rescue building with 1 firefighter:")
     total_time_1FF = rescue_building_1FF()
-    print(f"Total time with 1 firefighter: {total_time_1FF}\n")
+    print(f"Total time with 1 firefighter: {total_time_1FF} (lower bound {lower_bound('1FF')})\n")
 
     print("Rescue building with 2 firefighters:")
     total_time_2FF = rescue_building_2FF()
-    print(f"Total time with 2 firefighters: {total_time_2FF}\n")
+    print(f"Total time with 2 firefighters: {total_time_2FF} (lower bound {lower_bound('2FF')})\n")
+
+    print("Rescue building with 2 firefighters, fire starting in BM:")
+    total_time_fire = rescue_building_2FF(ignite=["BM"])
+    print(f"Total time with 2 firefighters and fire: {total_time_fire}\n")
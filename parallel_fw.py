@@ -0,0 +1,198 @@
+import os
+from multiprocessing import get_context, shared_memory
+from typing import List, Optional, Tuple
+import numpy as np
+from graph import Graph
+
+INF = 10**9  # Same sentinel as explorer.INF
+
+def parallel_floyd_warshall(graph: Graph, workers: Optional[int] = None, block: int = 128,
+                            tile: int = 2048) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Multi-core blocked Floyd-Warshall. Returns (dist, nxt) as (n, n) int64 arrays with the same
+    values as Explorer._floyd_warshall (INF for unreachable, -1 where nxt is None).
+    The k loop is processed in blocks of `block` pivots. Each phase:
+      1. the pivot rows k0..k1-1 are relaxed serially, recording every pivot row as it is at
+         iteration k (this is all the other rows need from the phase);
+      2. all other rows are split into bands that worker processes relax independently: first the
+         band's own pivot columns (recording each pivot column at iteration k), then the remaining
+         columns tile by tile.
+    Every cell sees the pivots in increasing order with exactly the operands of the serial
+    algorithm, so ties resolve identically and nxt matches bit for bit.
+    dist, nxt and the pivot rows live in multiprocessing.shared_memory; workers=1 runs in-process.
+    """
+    n = len(graph)
+    workers = workers or os.cpu_count() or 1
+    shms = []
+    try:
+        D, shm = _shared((n, n))
+        shms.append(shm)
+        N, shm = _shared((n, n))
+        shms.append(shm)
+        PB, shm = _shared((block, n))
+        shms.append(shm)
+
+        D.fill(INF)
+        N.fill(-1)
+        idx = np.arange(n)
+        D[idx, idx] = 0
+        N[idx, idx] = idx
+        for u, v, w in graph.edges():
+            if w < D[u, v]:
+                D[u, v] = D[v, u] = w
+                N[u, v] = v
+                N[v, u] = u
+
+        names = [s.name for s in shms]
+        pool = None
+        if workers > 1:
+            pool = get_context().Pool(workers, initializer=_attach, initargs=(names, n, block, tile))
+        else:
+            # In-process: use the arrays directly instead of mapping the segments a second time
+            _W.update(D=D, N=N, PB=PB, tile=tile)
+        try:
+            for k0 in range(0, n, block):
+                k1 = min(n, k0 + block)
+                _pivot_phase(D, N, PB, k0, k1)
+                tasks = _bands(0, k0, n, workers) + _bands(k1, n, n, workers)
+                tasks = [(k0, k1, r0, r1) for r0, r1 in tasks]
+                if pool is not None:
+                    pool.map(_relax_band, tasks)
+                else:
+                    for task in tasks:
+                        _relax_band(task)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+            _detach()
+        # Copy out one matrix at a time and free its segment before copying the next, so the peak is
+        # three n x n matrices rather than both segments plus both copies
+        dist = D.copy()
+        del D
+        _free(shms.pop(0))
+        nxt = N.copy()
+        del N
+        _free(shms.pop(0))
+        return dist, nxt
+    finally:
+        for s in shms:
+            _free(s)
+
+def to_lists(dist: np.ndarray, nxt: np.ndarray) -> Tuple[List[List[int]], List[List[Optional[int]]]]:
+    """Converts the arrays to Explorer's list-of-lists format (None for missing next hops)."""
+    return dist.tolist(), [[None if x < 0 else x for x in row] for row in nxt.tolist()]
+
+def _shared(shape: Tuple[int, int]) -> Tuple[np.ndarray, shared_memory.SharedMemory]:
+    shm = shared_memory.SharedMemory(create=True, size=max(1, shape[0] * shape[1] * 8))
+    return np.ndarray(shape, dtype=np.int64, buffer=shm.buf), shm
+
+def _free(shm: shared_memory.SharedMemory) -> None:
+    shm.close()
+    shm.unlink()
+
+def _bands(r0: int, r1: int, n: int, workers: int) -> List[Tuple[int, int]]:
+    """Splits rows [r0, r1) into bands, a few per worker so the pool stays balanced."""
+    if r1 <= r0:
+        return []
+    size = max(16, -(-(r1 - r0) // (workers * 4)))
+    return [(a, min(r1, a + size)) for a in range(r0, r1, size)]
+
+def _pivot_phase(D: np.ndarray, N: np.ndarray, PB: np.ndarray, k0: int, k1: int) -> None:
+    """Relaxes the pivot rows through iterations k0..k1-1 and records row k at iteration k in PB."""
+    rows = slice(k0, k1)
+    for k in range(k0, k1):
+        PB[k - k0] = D[k]
+        cand = D[rows, k][:, None] + PB[k - k0][None, :]
+        mask = cand < D[rows]
+        np.copyto(D[rows], cand, where=mask)
+        np.copyto(N[rows], np.broadcast_to(N[rows, k][:, None], mask.shape), where=mask)
+
+# --- Worker side: views onto the shared blocks, set up once per process ---
+_W = {}
+
+def _attach(names: List[str], n: int, block: int, tile: int) -> None:
+    shms = [shared_memory.SharedMemory(name=name) for name in names]
+    _W["shms"] = shms
+    _W["D"] = np.ndarray((n, n), dtype=np.int64, buffer=shms[0].buf)
+    _W["N"] = np.ndarray((n, n), dtype=np.int64, buffer=shms[1].buf)
+    _W["PB"] = np.ndarray((block, n), dtype=np.int64, buffer=shms[2].buf)
+    _W["tile"] = tile
+
+def _detach() -> None:
+    for key in ("D", "N", "PB"):
+        _W.pop(key, None)
+    for shm in _W.pop("shms", []):
+        shm.close()
+
+def _relax_band(task: Tuple[int, int, int, int]) -> None:
+    """Relaxes rows r0..r1-1 through pivots k0..k1-1 using the recorded pivot rows."""
+    k0, k1, r0, r1 = task
+    D, N, PB, tile = _W["D"], _W["N"], _W["PB"], _W["tile"]
+    n = D.shape[1]
+    rows = slice(r0, r1)
+    K = slice(k0, k1)
+    # Pivot columns first, recording column k of this band as it is at iteration k
+    colD = np.empty((r1 - r0, k1 - k0), dtype=np.int64)
+    colN = np.empty((r1 - r0, k1 - k0), dtype=np.int64)
+    DK = D[rows, K]
+    NK = N[rows, K]
+    for k in range(k0, k1):
+        c = k - k0
+        colD[:, c] = DK[:, c]
+        colN[:, c] = NK[:, c]
+        cand = colD[:, c][:, None] + PB[c, K][None, :]
+        mask = cand < DK
+        np.copyto(DK, cand, where=mask)
+        np.copyto(NK, np.broadcast_to(colN[:, c][:, None], mask.shape), where=mask)
+    # Remaining columns, one cache-sized tile at a time
+    for c0 in range(0, n, tile):
+        c1 = min(n, c0 + tile)
+        for a, b in ((c0, min(c1, k0)), (max(c0, k1), c1)):
+            if a >= b:
+                continue
+            DT = D[rows, a:b]
+            NT = N[rows, a:b]
+            cand = np.empty(DT.shape, dtype=np.int64)
+            mask = np.empty(DT.shape, dtype=bool)
+            for c in range(k1 - k0):
+                np.add(colD[:, c][:, None], PB[c, a:b][None, :], out=cand)
+                np.less(cand, DT, out=mask)
+                if not mask.any():
+                    continue
+                np.copyto(DT, cand, where=mask)
+                np.copyto(NT, np.broadcast_to(colN[:, c][:, None], mask.shape), where=mask)
+
+# Benchmark: python parallel_fw.py [n] [max_workers]
+# Checks the result against Explorer._floyd_warshall on a small graph, then times 1..N workers.
+if __name__ == "__main__":
+    import sys
+    import time
+    from explorer import Explorer
+    from landmarks import grid_graph
+
+    g = grid_graph(12, 12)
+    # Extra random chords create many equal-length alternatives, exercising tie-breaking
+    from random import Random
+    rnd = Random(3)
+    for _ in range(60):
+        g.add_edge(rnd.randrange(len(g)), rnd.randrange(len(g)), weight=rnd.randint(1, 3))
+    ref_dist, ref_nxt = Explorer(g)._floyd_warshall()
+    for workers in (1, 2):
+        dist, nxt = to_lists(*parallel_floyd_warshall(g, workers=workers, block=16, tile=40))
+        assert dist == ref_dist and nxt == ref_nxt, f"mismatch with {workers} workers"
+    print(f"{len(g)} locations: identical dist/nxt to Explorer._floyd_warshall")
+
+    side = int(int(sys.argv[1]) ** 0.5) if len(sys.argv) > 1 else 40
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    g = grid_graph(side, side)
+    print(f"\n{len(g)} locations, {os.cpu_count()} CPUs available")
+    base = None
+    for workers in sorted({1, 2, 4, 8, 16, 32, max_workers}):
+        if workers > max_workers:
+            continue
+        t0 = time.perf_counter()
+        parallel_floyd_warshall(g, workers=workers)
+        elapsed = time.perf_counter() - t0
+        base = base or elapsed
+        print(f"workers={workers:>2}: {elapsed:.2f} s (speedup {base / elapsed:.2f}x)")
@@ -0,0 +1,160 @@
+import sys
+from types import MappingProxyType
+from typing import List, Optional, Sequence, Tuple
+from explorer import Explorer, INF
+
+class QueryEngine:
+    """
+    Frozen, read-only view of an Explorer's shortest path tables, safe to share between threads.
+    Everything a query needs is copied at construction into tuples and a read-only mapping:
+      - labels / label_to_idx      - Location labels and their indices.
+      - dist: tuple of tuples      - Shortest distances (INF if unreachable).
+      - nxt: tuple of tuples       - Next hop toward the target (-1 if unreachable).
+      - exits                      - Indices of the locations that were exits when frozen.
+      - exit_dist / exit_idx       - Distance to and index of each location's nearest exit (INF / -1 if none).
+    Queries never read the Graph or its Location objects and never write any shared state, so
+    they need no locks, with or without the GIL. They allocate nothing but their result: distances
+    are table lookups, nearest-exit queries are precomputed, and paths are built into one new list.
+    Later graph changes (closed edges, new exits) are not seen; freeze a refreshed Explorer instead.
+    """
+    __slots__ = ("labels", "label_to_idx", "dist", "nxt", "exits", "exit_dist", "exit_idx")
+
+    def __init__(self, labels: Sequence[str], dist: Sequence[Sequence[int]], nxt: Sequence[Sequence[Optional[int]]], exits: Sequence[int]):
+        n = len(labels)
+        dist_t = tuple(tuple(row) for row in dist)
+        nxt_t = tuple(tuple(-1 if x is None else x for x in row) for row in nxt)
+        exits_t = tuple(exits)
+        exit_dist = [INF] * n
+        exit_idx = [-1] * n
+        for u in range(n):
+            row = dist_t[u]
+            for e in exits_t:
+                # Strictly smaller keeps the first exit on ties, like Explorer.find_nearest_exit_idx
+                if row[e] < exit_dist[u]:
+                    exit_dist[u] = row[e]
+                    exit_idx[u] = e
+        setattr_ = object.__setattr__
+        setattr_(self, "labels", tuple(labels))
+        setattr_(self, "label_to_idx", MappingProxyType({label: i for i, label in enumerate(labels)}))
+        setattr_(self, "dist", dist_t)
+        setattr_(self, "nxt", nxt_t)
+        setattr_(self, "exits", exits_t)
+        setattr_(self, "exit_dist", tuple(exit_dist))
+        setattr_(self, "exit_idx", tuple(exit_idx))
+
+    @classmethod
+    def from_explorer(cls, explorer: Explorer) -> "QueryEngine":
+        """Freezes the explorer's current tables and exits. Requires the dense Floyd-Warshall tables (no backend)."""
+        if explorer.dist is None:
+            raise ValueError("QueryEngine needs Explorer's dense tables; it cannot freeze a backend index")
+        return cls(explorer.labels, explorer.dist, explorer.nxt, explorer.exit_indices())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("QueryEngine is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("QueryEngine is immutable")
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    # --- Index-native queries ---
+    def distance_idx(self, u: int, v: int) -> Optional[int]:
+        d = self.dist[u][v]
+        return None if d == INF else d
+
+    def path_idx(self, u: int, v: int) -> List[int]:
+        """Returns the shortest path from u to v as node indices ([] if unreachable, [u] if u == v)."""
+        nxt = self.nxt
+        if nxt[u][v] < 0:
+            return []
+        path = [u]
+        while u != v:
+            u = nxt[u][v]
+            path.append(u)
+        return path
+
+    def get_path_idx(self, u: int, v: int) -> Tuple[Optional[int], List[int]]:
+        """Same contract as Explorer.get_path_idx."""
+        d = self.dist[u][v]
+        if d == INF:
+            return None, []
+        return d, self.path_idx(u, v)
+
+    def find_nearest_exit_idx(self, u: int) -> Tuple[Optional[int], Optional[int], List[int]]:
+        """Same contract as Explorer.find_nearest_exit_idx, answered from the precomputed nearest exits."""
+        e = self.exit_idx[u]
+        if e < 0:
+            return None, None, []
+        return self.exit_dist[u], e, self.path_idx(u, e)
+
+    # --- Label queries ---
+    def get_path(self, label_start: str, label_end: str) -> Tuple[Optional[int], List[str]]:
+        """Same contract as Explorer.get_path."""
+        u = self.label_to_idx.get(label_start)
+        v = self.label_to_idx.get(label_end)
+        if u is None or v is None or self.dist[u][v] == INF:
+            return None, []
+        labels = self.labels
+        return self.dist[u][v], [labels[i] for i in self.path_idx(u, v)]
+
+    def find_nearest_exit(self, start_label: str) -> Tuple[Optional[int], Optional[str], List[str]]:
+        """Same contract as Explorer.find_nearest_exit."""
+        u = self.label_to_idx.get(start_label)
+        if u is None or self.exit_idx[u] < 0:
+            return None, None, []
+        e = self.exit_idx[u]
+        labels = self.labels
+        return self.exit_dist[u], labels[e], [labels[i] for i in self.path_idx(u, e)]
+
+def gil_enabled() -> bool:
+    """True unless running on a free-threaded CPython build with the GIL disabled."""
+    is_enabled = getattr(sys, "_is_gil_enabled", None)
+    return True if is_enabled is None else is_enabled()
+
+# Benchmark: python query_engine.py [side] [queries]
+# Query throughput of one shared QueryEngine from 1 to 32 threads on a side x side corridor grid.
+if __name__ == "__main__":
+    import os
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from random import Random
+    from landmarks import grid_graph
+    from location import Location
+
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 14
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    graph = grid_graph(side, side)
+    for r in range(side):
+        graph.locations[r * side] = Location(f"EXIT_{r}", True, False)
+    explorer = Explorer(graph)
+    engine = QueryEngine.from_explorer(explorer)
+    n = len(engine)
+
+    rnd = Random(0)
+    pairs = [(rnd.randrange(n), rnd.randrange(n)) for _ in range(queries)]
+    # Same answers as the Explorer it was frozen from
+    for u, v in pairs[:2000]:
+        assert engine.get_path_idx(u, v) == explorer.get_path_idx(u, v)
+        assert engine.find_nearest_exit_idx(u) == explorer.find_nearest_exit_idx(u)
+
+    def work(chunk: Sequence[Tuple[int, int]]) -> int:
+        total = 0
+        for u, v in chunk:
+            total += len(engine.path_idx(u, v)) + engine.exit_dist[u]
+        return total
+
+    expected = work(pairs)
+    print(f"Python {sys.version.split()[0]}, GIL enabled: {gil_enabled()}, CPUs: {os.cpu_count()}")
+    print(f"{n} locations, {queries} path + nearest-exit queries per run")
+    base = None
+    for threads in (1, 2, 4, 8, 16, 32):
+        chunks = [pairs[i::threads] for i in range(threads)]
+        with ThreadPoolExecutor(threads) as pool:
+            t0 = time.perf_counter()
+            total = sum(pool.map(work, chunks))
+            elapsed = time.perf_counter() - t0
+        assert total == expected
+        rate = queries / elapsed
+        base = base or rate
+        print(f"  {threads:>2} threads: {rate / 1e3:8.1f} k queries/s  (x{rate / base:.2f})")
@@ -0,0 +1,175 @@
+from typing import Callable, Dict, List, Optional, Union
+from graph import Graph
+from location import Location, Room
+
+class ExitReachability:
+    """
+    Tracks which locations can still reach an exit while corridors are opened and closed.
+    Connected components are kept in a union-find whose roots know whether the component contains
+    an exit, together with the set of trapped locations (no exit in their component):
+      - edge insertions are applied immediately: merging a trapped component into one with an exit
+        frees exactly the trapped members, O(size of that component);
+      - edge deletions cannot be undone in a union-find, so they only mark the index dirty and the
+        components are rebuilt in one O(V + E) pass on the next query or flush(), however many
+        deletions were batched in between.
+    Queries are O(1) for is_trapped and O(output) for trapped() / trapped_rooms().
+    The monitor subscribes to the graph, so any add_edge/remove_edge (including edges closed by a
+    hazard.HazardModel) is seen. Exits are read from Location.is_exit when components are built;
+    call rebuild() after changing is_exit.
+    Batch boundaries: with lazy=True, on_trapped callbacks for deletions fire only when the batch is
+    applied, i.e. on the next query or flush(). follow(hazard) flushes after every HazardModel.step
+    that changed the graph, so each tick is one batch; other callers should flush() after each set
+    of edits. lazy=False rebuilds on every deletion instead.
+    """
+    def __init__(self, graph: Graph, lazy: bool = True):
+        self.graph = graph
+        self.lazy = lazy
+        self._parent: List[int] = []
+        self._members: Dict[int, List[int]] = {}
+        self._has_exit: Dict[int, bool] = {}
+        self._trapped: set = set()
+        self._trapped_rooms: set = set()
+        self._dirty = False
+        self._on_trapped: List[Callable[[int], None]] = []
+        self._on_freed: List[Callable[[int], None]] = []
+        self.rebuild()
+        graph.subscribe(self._on_graph_event)
+
+    def close(self) -> None:
+        """Stops following the graph."""
+        self.graph.unsubscribe(self._on_graph_event)
+
+    def follow(self, hazard) -> None:
+        """Makes every hazard.HazardModel step that opened or closed edges one batch, flushed at its end."""
+        hazard.on_change(lambda newly_blocked, newly_cleared: self.flush())
+
+    # --- Callbacks ---
+    def on_trapped(self, callback: Callable[[int], None]) -> None:
+        """Registers callback(location_idx), fired when a location loses its last route to an exit."""
+        self._on_trapped.append(callback)
+
+    def on_freed(self, callback: Callable[[int], None]) -> None:
+        """Registers callback(location_idx), fired when a trapped location can reach an exit again."""
+        self._on_freed.append(callback)
+
+    # --- Queries ---
+    def is_trapped(self, location: Union[int, Location]) -> bool:
+        self.flush()
+        idx = self.graph.location_index(location) if not isinstance(location, int) else location
+        return idx in self._trapped
+
+    def trapped(self) -> List[int]:
+        """All locations that cannot reach any exit."""
+        self.flush()
+        return list(self._trapped)
+
+    def trapped_rooms(self) -> List[int]:
+        """Rooms (not hallways) that cannot reach any exit."""
+        self.flush()
+        return list(self._trapped_rooms)
+
+    def flush(self) -> None:
+        """Applies batched edge deletions now, firing callbacks for the resulting changes."""
+        if self._dirty:
+            self.rebuild()
+
+    # --- Maintenance ---
+    def rebuild(self) -> None:
+        """Recomputes the components from scratch."""
+        n = len(self.graph)
+        self._parent = list(range(n))
+        self._members = {i: [i] for i in range(n)}
+        self._has_exit = {i: bool(getattr(self.graph.get_location(i), "is_exit", False)) for i in range(n)}
+        for u, v, _ in self.graph.edges():
+            self._union(u, v)
+        trapped = set()
+        for root, members in self._members.items():
+            if not self._has_exit[root]:
+                trapped.update(members)
+        old = self._trapped
+        self._trapped = set()
+        self._trapped_rooms = set()
+        self._dirty = False
+        for i in trapped:
+            self._mark_trapped(i, i not in old)
+        for i in old - trapped:
+            for callback in self._on_freed:
+                callback(i)
+
+    def _find(self, x: int) -> int:
+        parent = self._parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def _union(self, u: int, v: int) -> Optional[int]:
+        """Merges the components of u and v (smaller into larger). Returns the absorbed root, or None."""
+        ru, rv = self._find(u), self._find(v)
+        if ru == rv:
+            return None
+        if len(self._members[ru]) < len(self._members[rv]):
+            ru, rv = rv, ru
+        self._parent[rv] = ru
+        self._members[ru].extend(self._members.pop(rv))
+        absorbed_exit = self._has_exit.pop(rv)
+        self._has_exit[ru] = self._has_exit[ru] or absorbed_exit
+        return rv
+
+    def _mark_trapped(self, i: int, notify: bool) -> None:
+        self._trapped.add(i)
+        if isinstance(self.graph.get_location(i), Room):
+            self._trapped_rooms.add(i)
+        if notify:
+            for callback in self._on_trapped:
+                callback(i)
+
+    def _on_graph_event(self, event: str, u: int, v: Optional[int], w: Optional[int]) -> None:
+        if event == "remove_edge":
+            self._dirty = True
+            if not self.lazy:
+                self.rebuild()
+        elif self._dirty:
+            # Components are stale anyway; the pending rebuild will include this change
+            return
+        elif event == "add_location":
+            self._parent.append(u)
+            self._members[u] = [u]
+            self._has_exit[u] = bool(getattr(self.graph.get_location(u), "is_exit", False))
+            if not self._has_exit[u]:
+                self._mark_trapped(u, True)
+        elif event == "add_edge":
+            ru, rv = self._find(u), self._find(v)
+            if ru == rv:
+                return
+            freed: List[int] = []
+            if self._has_exit[ru] != self._has_exit[rv]:
+                freed = list(self._members[rv] if self._has_exit[ru] else self._members[ru])
+            self._union(u, v)
+            for i in freed:
+                self._trapped.discard(i)
+                self._trapped_rooms.discard(i)
+                for callback in self._on_freed:
+                    callback(i)
+
+# Example: python reachability.py
+if __name__ == "__main__":
+    from drawer import load_basic_floor
+    from explorer import Explorer
+
+    graph = load_basic_floor('Figure1_building_structure.json')
+    labels = Explorer(graph).labels
+    idx = {label: i for i, label in enumerate(labels)}
+    monitor = ExitReachability(graph)
+    monitor.on_trapped(lambda i: print(f"  {labels[i]} is trapped"))
+    monitor.on_freed(lambda i: print(f"  {labels[i]} can reach an exit again"))
+
+    print("Close H_L-EXIT_L and H_R-EXIT_R:")
+    graph.remove_edge(idx["H_L"], idx["EXIT_L"])
+    graph.remove_edge(idx["H_R"], idx["EXIT_R"])
+    print("Trapped rooms:", sorted(labels[i] for i in monitor.trapped_rooms()))
+    print("Reopen H_R-EXIT_R:")
+    graph.add_edge(idx["H_R"], idx["EXIT_R"], weight=5)
+    print("Is TL trapped?", monitor.is_trapped(idx["TL"]))
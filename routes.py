@@ -0,0 +1,244 @@
+from concurrent.futures import ProcessPoolExecutor
+from heapq import heappush, heappop
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from graph import Graph
+from location import Room
+
+SINK = -1  # Virtual node joined to every exit with a zero-weight edge
+
+class EscapeRoutes:
+    """
+    The k shortest loopless routes from each source location (default: every room) to any exit,
+    found with Yen's algorithm toward a virtual sink behind all exits. A route ends at the first
+    exit it reaches.
+    Routes are stored compactly, CSR-style:
+      - nodes: int64 array         - All routes' location indices, concatenated.
+      - route_start: int64 array   - Route r is nodes[route_start[r]:route_start[r + 1]].
+      - cost: int64 array          - Length of each route.
+      - source_start: int64 array  - Routes of location u are route_start[source_start[u]:source_start[u + 1]], shortest first.
+    The monitor subscribes to the graph: removing an edge increments a blocked counter on every
+    route that uses it (found through an edge -> routes index) and re-adding it decrements it, so
+    fallback() just returns the first route of the source with no blocked edge, O(k).
+    Re-weighting an edge does not re-rank routes; rebuild for that.
+    Precomputation is independent per source and runs in a ProcessPoolExecutor when workers > 1.
+    """
+    def __init__(self, graph: Graph, k: int = 3, sources: Optional[Iterable[int]] = None, workers: Optional[int] = None):
+        self.graph = graph
+        self.k = k
+        n = len(graph)
+        if sources is None:
+            sources = [i for i, location in enumerate(graph.locations) if isinstance(location, Room)]
+        sources = list(sources)
+        adj = {u: dict(nbrs) for u, nbrs in graph._adj.items()}
+        exits = [i for i, location in enumerate(graph.locations) if getattr(location, "is_exit", False)]
+
+        if workers is not None and workers > 1 and len(sources) > 1:
+            chunks = [sources[i::workers] for i in range(workers)]
+            with ProcessPoolExecutor(workers) as pool:
+                parts = list(pool.map(_routes_for_sources, [adj] * workers, [exits] * workers, chunks, [k] * workers))
+            found = {u: routes for part in parts for u, routes in part.items()}
+        else:
+            found = _routes_for_sources(adj, exits, sources, k)
+
+        nodes: List[int] = []
+        route_start = [0]
+        cost: List[int] = []
+        counts = np.zeros(n, dtype=np.int64)
+        for u in sorted(found):
+            counts[u] = len(found[u])
+            for c, path in found[u]:
+                nodes.extend(path)
+                route_start.append(len(nodes))
+                cost.append(c)
+        self.nodes = np.array(nodes, dtype=np.int64)
+        self.route_start = np.array(route_start, dtype=np.int64)
+        self.cost = np.array(cost, dtype=np.int64)
+        self.source_start = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        # Inverted index: undirected edge -> routes using it
+        self._edge_routes: Dict[Tuple[int, int], List[int]] = {}
+        for r in range(len(self.cost)):
+            path = self.nodes[self.route_start[r]:self.route_start[r + 1]].tolist()
+            for a, b in zip(path, path[1:]):
+                self._edge_routes.setdefault((a, b) if a <= b else (b, a), []).append(r)
+        self.blocked = np.zeros(len(self.cost), dtype=np.int32)
+        self._removed: set = set()
+        graph.subscribe(self._on_graph_event)
+
+    def close(self) -> None:
+        """Stops following the graph."""
+        self.graph.unsubscribe(self._on_graph_event)
+
+    def route(self, r: int) -> List[int]:
+        return self.nodes[self.route_start[r]:self.route_start[r + 1]].tolist()
+
+    def routes(self, source: int) -> List[Tuple[int, List[int]]]:
+        """All precomputed (cost, path_indices) routes from source, shortest first, blocked or not."""
+        return [(int(self.cost[r]), self.route(r)) for r in range(self.source_start[source], self.source_start[source + 1])]
+
+    def fallback(self, source: int) -> Tuple[Optional[int], List[int]]:
+        """Returns (cost, path_indices) of the shortest precomputed route that uses no removed edge, or (None, [])."""
+        if source + 1 >= len(self.source_start):
+            return None, []
+        blocked = self.blocked
+        for r in range(self.source_start[source], self.source_start[source + 1]):
+            if not blocked[r]:
+                return int(self.cost[r]), self.route(r)
+        return None, []
+
+    def _on_graph_event(self, event: str, u: int, v: Optional[int], w: Optional[int]) -> None:
+        if event == "remove_edge":
+            key = (u, v) if u <= v else (v, u)
+            if key not in self._removed:
+                self._removed.add(key)
+                for r in self._edge_routes.get(key, ()):
+                    self.blocked[r] += 1
+        elif event == "add_edge":
+            key = (u, v) if u <= v else (v, u)
+            if key in self._removed:
+                self._removed.discard(key)
+                for r in self._edge_routes.get(key, ()):
+                    self.blocked[r] -= 1
+
+def _routes_for_sources(adj: Dict[int, Dict[int, int]], exits: Sequence[int], sources: Sequence[int], k: int) -> Dict[int, List[Tuple[int, List[int]]]]:
+    """Yen's algorithm for each source; module level so worker processes can run it."""
+    exit_set = set(exits)
+    to_exit, exit_next = _exit_tree(adj, exits)
+    return {u: _yen(adj, exit_set, to_exit, exit_next, u, k) for u in sources}
+
+def _exit_tree(adj: Dict[int, Dict[int, int]], exits: Sequence[int]) -> Tuple[Dict[int, int], Dict[int, int]]:
+    """Multi-source Dijkstra from the exits: distance to the nearest exit and the next hop toward it."""
+    dist = {e: 0 for e in exits}
+    nxt: Dict[int, int] = {}
+    heap = [(0, e) for e in exits]
+    while heap:
+        d, x = heappop(heap)
+        if d > dist[x]:
+            continue
+        for y, w in adj[x].items():
+            nd = d + w
+            if nd < dist.get(y, nd + 1):
+                dist[y] = nd
+                nxt[y] = x
+                heappush(heap, (nd, y))
+    return dist, nxt
+
+def _yen(adj: Dict[int, Dict[int, int]], exits: set, to_exit: Dict[int, int], exit_next: Dict[int, int],
+         source: int, k: int) -> List[Tuple[int, List[int]]]:
+    """Returns up to k (cost, path) loopless routes from source to an exit, shortest first (paths exclude SINK)."""
+    first = _spur_route(adj, exits, to_exit, exit_next, source, set(), set())
+    if first is None:
+        return []
+    found = [first]
+    candidates: List[Tuple[int, List[int]]] = []
+    seen = {tuple(first[1])}
+    while len(found) < k:
+        last = found[-1][1]
+        root_cost = 0
+        for j in range(len(last)):
+            spur = last[j]
+            root = last[:j + 1]
+            if j:
+                root_cost += adj[last[j - 1]][spur]
+            banned_edges = set()
+            for _, path in found:
+                if len(path) > j and path[:j + 1] == root:
+                    banned_edges.add((path[j], path[j + 1] if len(path) > j + 1 else SINK))
+            spur_route = _spur_route(adj, exits, to_exit, exit_next, spur, set(root[:-1]), banned_edges)
+            if spur_route is None:
+                continue
+            path = root[:-1] + spur_route[1]
+            if tuple(path) not in seen:
+                seen.add(tuple(path))
+                heappush(candidates, (root_cost + spur_route[0], path))
+        if not candidates:
+            break
+        found.append(heappop(candidates))
+    return found
+
+def _spur_route(adj: Dict[int, Dict[int, int]], exits: set, to_exit: Dict[int, int], exit_next: Dict[int, int],
+                source: int, banned_nodes: set, banned_edges: set) -> Optional[Tuple[int, List[int]]]:
+    """
+    Shortest route from source to the virtual sink avoiding the banned nodes and edges, ending at
+    the first exit reached. Returns (cost, path) or None.
+    The unrestricted shortest route (the exit tree path) is used when it avoids every ban;
+    otherwise A* runs with the distance to the nearest exit as a consistent heuristic.
+    """
+    if source not in to_exit:
+        return None
+    path = [source]
+    while path[-1] not in exits:
+        x = path[-1]
+        y = exit_next[x]
+        if y in banned_nodes or (x, y) in banned_edges:
+            break
+        path.append(y)
+    else:
+        if (path[-1], SINK) not in banned_edges:
+            return to_exit[source], path
+
+    dist = {source: 0}
+    prev: Dict[int, int] = {}
+    heap = [(to_exit[source], source)]
+    while heap:
+        f, x = heappop(heap)
+        d = dist[x]
+        if f > d + to_exit[x]:
+            continue
+        if x in exits:
+            if (x, SINK) in banned_edges:
+                continue
+            path = [x]
+            while path[-1] != source:
+                path.append(prev[path[-1]])
+            return d, path[::-1]
+        for y, w in adj[x].items():
+            if y in banned_nodes or (x, y) in banned_edges:
+                continue
+            nd = d + w
+            if nd < dist.get(y, nd + 1):
+                dist[y] = nd
+                prev[y] = x
+                heappush(heap, (nd + to_exit[y], y))
+    return None
+
+# Example / benchmark: python routes.py [side] [workers]
+if __name__ == "__main__":
+    import os
+    import sys
+    import time
+    from drawer import load_basic_floor
+    from explorer import Explorer
+    from landmarks import grid_graph
+    from location import Location
+
+    graph = load_basic_floor('Figure1_building_structure.json')
+    explorer = Explorer(graph)
+    labels, idx = explorer.labels, explorer.label_to_idx
+    escape = explorer.escape_routes(k=3)
+    for cost, path in escape.routes(idx["TL"]):
+        print(f"TL: {cost:>3} {' -> '.join(labels[i] for i in path)}")
+    assert escape.routes(idx["TL"])[0][0] == explorer.find_nearest_exit("TL")[0]
+    graph.remove_edge(idx["H_L"], idx["EXIT_L"])
+    cost, exit_label, path = explorer.find_fallback_exit("TL")
+    print(f"H_L-EXIT_L closed, fallback: {cost} {' -> '.join(path)}")
+    graph.add_edge(idx["H_L"], idx["EXIT_L"], weight=5)
+    print("Reopened, fallback:", escape.fallback(idx["TL"]))
+
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    big = grid_graph(side, side)
+    for r in range(side):
+        big.locations[r * side] = Location(f"EXIT_{r}", True, False)
+    sources = [i for i in range(len(big)) if i % side]
+    print(f"\n{len(sources)} sources on a {side}x{side} grid, k=3, {os.cpu_count()} CPUs")
+    for workers in sorted({1, max_workers}):
+        t0 = time.perf_counter()
+        escape = EscapeRoutes(big, k=3, sources=sources, workers=workers)
+        print(f"workers={workers}: {time.perf_counter() - t0:.2f} s, {len(escape.cost)} routes in {escape.nodes.nbytes // 1024} KiB")
+    u = sources[len(sources) // 2]
+    t0 = time.perf_counter()
+    for _ in range(10000):
+        escape.fallback(u)
+    print(f"fallback lookup: {(time.perf_counter() - t0) / 10000 * 1e6:.1f} us")
@@ -0,0 +1,270 @@
+import contextlib
+import hashlib
+import io
+import json
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from graph import Graph
+from location import Room
+from person import Person
+from session import BuildingSession
+
+SCHEDULERS = ("1FF", "2FF")
+FINGERPRINT_VERSION = 2  # Bump whenever the canonical form or the schedulers' behaviour changes
+
+class Scenario:
+    """
+    One run of a main.py scheduler.
+      - building: building JSON file.
+      - scheduler: "1FF" or "2FF".
+      - occupants: optional {room_label: [velocity, ...]} replacing those rooms' occupants.
+      - self_evacuation_velocity: passed through to the scheduler.
+    """
+    def __init__(self, building: str = 'Figure1_building_structure.json', scheduler: str = "1FF",
+                 occupants: Optional[Dict[str, List[int]]] = None, self_evacuation_velocity: Optional[int] = None):
+        if scheduler not in SCHEDULERS:
+            raise ValueError(f"Unknown scheduler {scheduler!r}")
+        self.building = building
+        self.scheduler = scheduler
+        self.occupants = occupants or {}
+        self.self_evacuation_velocity = self_evacuation_velocity
+
+    def __repr__(self) -> str:
+        return f"<Scenario {self.scheduler} {self.building} occupants={self.occupants}>"
+
+
+def fingerprint(graph: Graph, scenario: Scenario, approximate_symmetry: bool = False) -> str:
+    """
+    SHA-256 of the canonical form of a scenario applied to `graph` (occupants already in place):
+    per-location kind, explore_time, size and sorted occupant velocities (person IDs and labels do
+    not matter), weighted edges, firefighter velocities and start indices (main.firefighter_setup),
+    scheduler options and FINGERPRINT_VERSION.
+    With approximate_symmetry=True the form is minimized over the building's symmetries (e.g.
+    swapping the mirror-image rooms TL/BL), so mirrored occupancies share one key. The schedulers do
+    not respect those symmetries (BFS visits neighbours in index order, 2FF starts at the first two
+    exits), so a mirrored run can get a different total: keys made this way only identify
+    approximately equal scenarios, and never collide with exact keys.
+    """
+    structure = [_structure(location) for location in graph.locations]
+    occupancy = [sorted(p.velocity for p in location.person_list.values()) for location in graph.locations]
+    edges = sorted(graph.edges())
+    import main
+    velocities, start_labels = main.firefighter_setup(graph, scenario.scheduler)
+    label_to_idx = {location.label: i for i, location in enumerate(graph.locations)}
+    starts = [label_to_idx.get(label, -1) for label in start_labels]
+
+    def form(perm: Sequence[int]) -> str:
+        occ = [None] * len(perm)
+        for i, j in enumerate(perm):
+            occ[j] = occupancy[i]
+        return json.dumps({
+            "version": FINGERPRINT_VERSION,
+            "structure": structure,
+            "edges": edges,
+            "occupancy": occ,
+            "scheduler": scenario.scheduler,
+            "velocities": velocities,
+            "starts": [perm[s] if s >= 0 else -1 for s in starts],
+            "self_evacuation_velocity": scenario.self_evacuation_velocity,
+            "approximate_symmetry": approximate_symmetry,
+        }, separators=(",", ":"))
+
+    identity = list(range(len(graph)))
+    canonical = min(form(p) for p in graph_automorphisms(graph)) if approximate_symmetry else form(identity)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def _structure(location) -> Tuple:
+    if isinstance(location, Room):
+        return ("room", location.explore_time, location.size)
+    return ("exit" if location.is_exit else "hallway", 0, 0)
+
+def graph_automorphisms(graph: Graph, limit: int = 10000) -> List[List[int]]:
+    """
+    Returns permutations p (location i -> p[i]) preserving location kind/explore_time/size and
+    weighted adjacency, found by colour refinement plus backtracking. Stops after `limit`.
+    The identity is always first.
+    """
+    n = len(graph)
+    adj = graph._adj
+    colors = [hash(_structure(location)) for location in graph.locations]
+    # Colour refinement: a vertex's colour absorbs the multiset of (weight, neighbour colour)
+    while True:
+        refined = [hash((colors[u], tuple(sorted((w, colors[v]) for v, w in adj[u].items())))) for u in range(n)]
+        if len(set(refined)) == len(set(colors)):
+            break
+        colors = refined
+    by_color: Dict[int, List[int]] = {}
+    for u in range(n):
+        by_color.setdefault(colors[u], []).append(u)
+
+    out: List[List[int]] = []
+    perm = [-1] * n
+    used = [False] * n
+
+    def extend(u: int) -> None:
+        if len(out) >= limit:
+            return
+        if u == n:
+            out.append(list(perm))
+            return
+        for v in by_color[colors[u]]:
+            if used[v]:
+                continue
+            # Every already-mapped neighbour relation must be preserved with the same weight
+            if any(perm[x] >= 0 and adj[v].get(perm[x]) != w for x, w in adj[u].items()):
+                continue
+            mapped_nbrs = sum(1 for x in adj[u] if perm[x] >= 0)
+            if mapped_nbrs != sum(1 for y in adj[v] if y in image):
+                continue
+            perm[u] = v
+            used[v] = True
+            image.add(v)
+            extend(u + 1)
+            perm[u] = -1
+            used[v] = False
+            image.discard(v)
+
+    image: set = set()
+    extend(0)
+    return out
+
+
+class ScenarioStore:
+    """Persistent fingerprint -> result store in a SQLite file (":memory:" for a throwaway one)."""
+    def __init__(self, path: str = "scenario_results.sqlite"):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.conn.commit()
+
+    def get(self, key: str) -> Optional[dict]:
+        row = self.conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, value: dict) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+        self.conn.commit()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class ScenarioRunner:
+    """
+    Runs scenarios on one BuildingSession per building file, answering repeated scenarios from a
+    ScenarioStore instead of re-simulating them. With approximate_symmetry=True, mirror-image
+    scenarios are answered from each other too (see fingerprint), although their totals may differ.
+    """
+    def __init__(self, store: Optional[ScenarioStore] = None, approximate_symmetry: bool = False):
+        self.store = store if store is not None else ScenarioStore(":memory:")
+        self.approximate_symmetry = approximate_symmetry
+        self.sessions: Dict[str, BuildingSession] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def add_building(self, name: str, session: BuildingSession) -> None:
+        """Registers an already loaded building under `name`, for Scenario(building=name)."""
+        self.sessions[name] = session
+
+    def session(self, building: str) -> BuildingSession:
+        if building not in self.sessions:
+            self.sessions[building] = BuildingSession(building)
+        return self.sessions[building]
+
+    def run(self, scenario: Scenario) -> dict:
+        """Returns {"total_time": ...} for the scenario, from the store when possible."""
+        import main
+        session = self.session(scenario.building)
+        session.reset()
+        original = session.set_baseline()
+        try:
+            _apply_occupants(session, scenario.occupants)
+            key = fingerprint(session.graph, scenario, self.approximate_symmetry)
+            result = self.store.get(key)
+            if result is not None:
+                self.hits += 1
+                return result
+            self.misses += 1
+            session.set_baseline()
+            scheduler = main.rescue_building_1FF if scenario.scheduler == "1FF" else main.rescue_building_2FF
+            with contextlib.redirect_stdout(io.StringIO()):
+                total = scheduler(session, self_evacuation_velocity=scenario.self_evacuation_velocity)
+            result = {"total_time": total}
+            self.store.put(key, result)
+            return result
+        finally:
+            session.set_baseline(original)
+            session.reset()
+
+    def sweep(self, scenarios: Iterable[Scenario]) -> List[dict]:
+        return [self.run(s) for s in scenarios]
+
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self) -> str:
+        return (f"{self.hits + self.misses} scenarios: {self.hits} cached, {self.misses} simulated,"
+                f" hit ratio {self.hit_ratio():.1%}, {len(self.store)} stored results")
+
+def _apply_occupants(session: BuildingSession, occupants: Dict[str, List[int]]) -> None:
+    next_id = 1 + max((pid for loc in session.graph.locations for pid in loc.person_list), default=0)
+    for label, velocities in occupants.items():
+        location = session.explorer.get_location_by_label(label)
+        if not isinstance(location, Room):
+            raise ValueError(f"{label!r} is not a room")
+        people = {}
+        for v in velocities:
+            people[next_id] = Person(next_id, v)
+            next_id += 1
+        location.person_list = people
+
+# Example sweep: python scenario.py
+# Occupancy variants of Figure 1 with the bottom rooms made mirror images of the top ones, so that
+# swapping TL/BL occupants is a symmetry of the building; plus exact repeats.
+if __name__ == "__main__":
+    import itertools
+    import time
+    from drawer import load_basic_floor
+
+    def mirrored_building() -> BuildingSession:
+        graph = load_basic_floor('Figure1_building_structure.json')
+        index = {location.label: i for i, location in enumerate(graph.locations)}
+        for top, bottom, hallway in (("TL", "BL", "H_L"), ("TM", "BM", "H_M"), ("TR", "BR", "H_R")):
+            t, b = graph.get_location(index[top]), graph.get_location(index[bottom])
+            b.explore_time, b.size = t.explore_time, t.size
+            graph.remove_edge(index[bottom], index[hallway])
+            graph.add_edge(index[bottom], index[hallway], graph.weight(index[top], index[hallway]))
+        return BuildingSession(graph=graph)
+
+    variants = [[], [1], [1, 3], [2, 2, 4]]
+    scenarios = []
+    for top, bottom in itertools.product(variants, repeat=2):
+        for scheduler in ("1FF", "2FF"):
+            scenarios.append(Scenario("mirrored", scheduler, occupants={"TL": top, "BL": bottom}))
+    scenarios += scenarios[:8]  # repeated runs
+
+    sweeps = {}
+    for approximate_symmetry in (False, True):
+        runner = ScenarioRunner(approximate_symmetry=approximate_symmetry)
+        runner.add_building("mirrored", mirrored_building())
+        t0 = time.perf_counter()
+        sweeps[approximate_symmetry] = runner.sweep(scenarios)
+        print(f"approximate_symmetry={approximate_symmetry}: {runner.report()} in {(time.perf_counter() - t0) * 1e3:.0f} ms")
+    wrong = sum(a != b for a, b in zip(sweeps[False], sweeps[True]))
+    print(f"approximate_symmetry answered {wrong} of {len(scenarios)} scenarios with a mirrored run's different total")
+
+    # Answers served from the store match fresh simulations when symmetry is not used
+    runner = ScenarioRunner()
+    session = mirrored_building()
+    runner.add_building("mirrored", session)
+    cached = runner.sweep(scenarios)
+    fresh = []
+    for scenario in scenarios:
+        once = ScenarioRunner()
+        once.add_building("mirrored", session)
+        fresh.append(once.run(scenario))
+    assert cached == fresh
+    print("cached results match fresh simulations")
@@ -0,0 +1,250 @@
+import contextlib
+import io
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from location import Room
+from person import Person
+from session import BuildingSession
+
+EXPLORE_TIME = "explore_time"
+DOOR_WEIGHT = "door_weight"   # Weight of a room's door edges (loaded from Room.size); the only topological kind
+VELOCITY = "velocity"         # Multiplier on every occupant velocity in the room
+
+class Parameter:
+    """One perturbable building parameter of a room, named "<label>.<kind>"."""
+    def __init__(self, label: str, kind: str, base: float):
+        self.label = label
+        self.kind = kind
+        self.base = base
+        self.name = f"{label}.{kind}"
+
+    def __repr__(self) -> str:
+        return f"<Parameter {self.name} base={self.base}>"
+
+def room_parameters(session: BuildingSession, kinds: Sequence[str] = (EXPLORE_TIME, DOOR_WEIGHT, VELOCITY)) -> List[Parameter]:
+    """Every room's explore_time, door weight and (if occupied) occupant velocity multiplier."""
+    graph = session.graph
+    params = []
+    for i, location in enumerate(graph.locations):
+        if not isinstance(location, Room):
+            continue
+        if EXPLORE_TIME in kinds:
+            params.append(Parameter(location.label, EXPLORE_TIME, location.explore_time))
+        doors = graph.neighbors(i)
+        if DOOR_WEIGHT in kinds and doors:
+            params.append(Parameter(location.label, DOOR_WEIGHT, graph.weight(i, doors[0])))
+        if VELOCITY in kinds and location.person_list:
+            params.append(Parameter(location.label, VELOCITY, 1.0))
+    return params
+
+def one_at_a_time(params: Sequence[Parameter], step: float = 0.5) -> List[Dict[str, float]]:
+    """Two perturbations per parameter, base * (1 - step) and base * (1 + step), the others at base."""
+    out = []
+    for p in params:
+        out.append({p.name: p.base * (1 - step)})
+        out.append({p.name: p.base * (1 + step)})
+    return out
+
+def latin_hypercube(params: Sequence[Parameter], samples: int, spread: float = 0.5, seed: int = 0) -> List[Dict[str, float]]:
+    """
+    `samples` perturbations of all parameters at once, Latin-hypercube sampled in
+    [base * (1 - spread), base * (1 + spread)]: each parameter hits every 1/samples stratum exactly once.
+    """
+    rng = np.random.default_rng(seed)
+    u = (np.argsort(rng.random((len(params), samples)), axis=1) + rng.random((len(params), samples))) / samples
+    base = np.array([p.base for p in params], dtype=np.float64)[:, None]
+    values = base * (1 - spread + 2 * spread * u)
+    return [{p.name: float(values[k, s]) for k, p in enumerate(params)} for s in range(samples)]
+
+
+class SensitivityAnalysis:
+    """
+    Evaluates batches of parameter perturbations with a main.py scheduler on one BuildingSession.
+    Perturbations are grouped by their door weights, the only parameters that change shortest paths:
+      - the unperturbed Explorer tables are reused for every perturbation without door changes;
+      - each distinct set of door weights updates the tables once for all perturbations of the
+        group: relaxed incrementally (Explorer.update_edge) when every door got shorter, recomputed
+        otherwise; the saved tables are put back afterwards instead of being recomputed.
+    explore_time changes are plain attribute writes undone after each run; occupant changes are
+    journaled person_list writes, made the session's baseline for the run (the schedulers reset the
+    session first) and rolled back afterwards.
+    Values are rounded to integers of at least 1, as the building model uses integer times and velocities;
+    a VELOCITY multiplier stays continuous and only the resulting occupant velocities are rounded.
+    """
+    def __init__(self, session: Optional[BuildingSession] = None, scheduler: str = "1FF",
+                 parameters: Optional[Sequence[Parameter]] = None, self_evacuation_velocity: Optional[int] = None):
+        import main
+        self.session = session if session is not None else BuildingSession('Figure1_building_structure.json')
+        self.scheduler = main.rescue_building_1FF if scheduler == "1FF" else main.rescue_building_2FF
+        self.self_evacuation_velocity = self_evacuation_velocity
+        self.parameters = list(parameters) if parameters is not None else room_parameters(self.session)
+        self.by_name = {p.name: p for p in self.parameters}
+        self.table_updates = 0
+        self.recomputes = 0
+        self.last_totals = np.zeros(0, dtype=np.int64)
+        self.base_total = self._run()
+
+    def evaluate(self, perturbations: Sequence[Dict[str, float]]) -> np.ndarray:
+        """Returns the scheduler's total time for each perturbation ({parameter name: value})."""
+        totals = np.zeros(len(perturbations), dtype=np.int64)
+        groups: Dict[Tuple, List[int]] = {}
+        for i, perturbation in enumerate(perturbations):
+            doors = tuple(sorted((name, _int(value)) for name, value in perturbation.items()
+                                 if self.by_name[name].kind == DOOR_WEIGHT))
+            groups.setdefault(doors, []).append(i)
+        for doors, members in groups.items():
+            with self._doors(doors):
+                for i in members:
+                    totals[i] = self._run(perturbations[i])
+        return totals
+
+    @contextlib.contextmanager
+    def _doors(self, doors: Tuple[Tuple[str, int], ...]):
+        if not doors:
+            yield
+            return
+        explorer = self.session.explorer
+        graph = self.session.graph
+        saved = ([row[:] for row in explorer.dist], [row[:] for row in explorer.nxt])
+        changes = []
+        for name, weight in doors:
+            room = explorer.label_to_idx[self.by_name[name].label]
+            changes.extend((room, hall, graph.weight(room, hall), weight) for hall in graph.neighbors(room))
+        self.table_updates += 1
+        try:
+            if all(new <= old for _, _, old, new in changes):
+                # Only shorter doors: relax the saved tables through each edge
+                for room, hall, _, new in changes:
+                    explorer.update_edge(room, hall, new)
+            else:
+                for room, hall, _, new in changes:
+                    graph.add_edge(room, hall, new)
+                explorer.refresh()
+                self.recomputes += 1
+            yield
+        finally:
+            for room, hall, old, _ in changes:
+                graph.add_edge(room, hall, old)
+            explorer.dist, explorer.nxt = saved
+
+    def _run(self, perturbation: Optional[Dict[str, float]] = None) -> int:
+        session = self.session
+        explorer = session.explorer
+        session.reset()
+        previous = session.set_baseline()
+        explore_restore = []
+        try:
+            for name, value in (perturbation or {}).items():
+                p = self.by_name[name]
+                room = explorer.get_location_by_label(p.label)
+                if p.kind == EXPLORE_TIME:
+                    explore_restore.append((room, room.explore_time))
+                    room.explore_time = _int(value)
+                elif p.kind == VELOCITY:
+                    room.person_list = {pid: Person(pid, _int(person.velocity * value)) for pid, person in room.person_list.items()}
+            session.set_baseline()
+            with contextlib.redirect_stdout(io.StringIO()):
+                return self.scheduler(session, self_evacuation_velocity=self.self_evacuation_velocity)
+        finally:
+            for room, explore_time in explore_restore:
+                room.explore_time = explore_time
+            session.set_baseline(previous)
+            session.reset()
+
+    # --- Rankings ---
+    def one_at_a_time(self, step: float = 0.5) -> List[dict]:
+        """Runs one_at_a_time perturbations; rows ranked by the swing of the total between the low and high value."""
+        perturbations = one_at_a_time(self.parameters, step)
+        totals = self.evaluate(perturbations)
+        rows = []
+        for k, p in enumerate(self.parameters):
+            low, high = totals[2 * k], totals[2 * k + 1]
+            lo_v, hi_v = p.base * (1 - step), p.base * (1 + step)
+            if p.kind != VELOCITY:
+                lo_v, hi_v = _int(lo_v), _int(hi_v)
+            slope = (high - low) / (hi_v - lo_v) if hi_v != lo_v else 0.0
+            rows.append({"parameter": p.name, "base": p.base, "low": int(low), "high": int(high),
+                         "swing": int(high - low), "elasticity": slope * p.base / self.base_total if self.base_total else 0.0})
+        rows.sort(key=lambda r: -abs(r["swing"]))
+        return rows
+
+    def latin_hypercube(self, samples: int = 64, spread: float = 0.5, seed: int = 0) -> List[dict]:
+        """
+        Runs latin_hypercube perturbations; rows ranked by the Spearman correlation of each parameter
+        with the total. The sampled totals are kept in last_totals.
+        """
+        perturbations = latin_hypercube(self.parameters, samples, spread, seed)
+        totals = self.evaluate(perturbations)
+        total_ranks = _ranks(totals)
+        rows = []
+        for p in self.parameters:
+            values = np.array([_int(x[p.name]) if p.kind != VELOCITY else x[p.name] for x in perturbations])
+            rho = _correlation(_ranks(values), total_ranks)
+            rows.append({"parameter": p.name, "base": p.base, "spearman": rho})
+        rows.sort(key=lambda r: -abs(r["spearman"]))
+        self.last_totals = totals
+        return rows
+
+def _int(value: float) -> int:
+    return max(1, int(round(value)))
+
+def _ranks(values: np.ndarray) -> np.ndarray:
+    """Average ranks (ties share their mean rank)."""
+    values = np.asarray(values, dtype=np.float64)
+    order = np.argsort(values, kind="stable")
+    ranks = np.empty(len(values))
+    ranks[order] = np.arange(len(values))
+    _, inverse = np.unique(values, return_inverse=True)
+    sums = np.bincount(inverse, weights=ranks)
+    counts = np.bincount(inverse)
+    return (sums / counts)[inverse]
+
+def _correlation(a: np.ndarray, b: np.ndarray) -> float:
+    a, b = a - a.mean(), b - b.mean()
+    denom = np.sqrt((a * a).sum() * (b * b).sum())
+    return float((a * b).sum() / denom) if denom else 0.0
+
+def format_table(rows: List[dict]) -> str:
+    """Renders ranked rows as a fixed-width text table."""
+    if not rows:
+        return ""
+    columns = list(rows[0])
+    cells = [[f"{r[c]:.3f}" if isinstance(r[c], float) else str(r[c]) for c in columns] for r in rows]
+    widths = [max(len(c), *(len(row[i]) for row in cells)) for i, c in enumerate(columns)]
+    lines = ["rank  " + "  ".join(c.rjust(w) for c, w in zip(columns, widths))]
+    for rank, row in enumerate(cells, 1):
+        lines.append(f"{rank:>4}  " + "  ".join(x.rjust(w) for x, w in zip(row, widths)))
+    return "\n".join(lines)
+
+# Example: python sensitivity.py [samples]
+# Ranks the Figure 1 room parameters for both schedulers (occupants self-evacuate at velocity >= 3,
+# so occupant velocities matter too), then repeats the Latin hypercube without door weights,
+# which reuses the unperturbed shortest path tables for every run.
+if __name__ == "__main__":
+    import sys
+    import time
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+
+    def timed(analysis: SensitivityAnalysis, method, *args) -> Tuple[List[dict], str]:
+        updates, recomputes = analysis.table_updates, analysis.recomputes
+        t0 = time.perf_counter()
+        rows = method(*args)
+        elapsed = time.perf_counter() - t0
+        return rows, (f"in {elapsed * 1e3:.0f} ms, {analysis.table_updates - updates} door-weight table updates"
+                      f" ({analysis.recomputes - recomputes} full recomputations)")
+
+    for scheduler in ("1FF", "2FF"):
+        analysis = SensitivityAnalysis(scheduler=scheduler, self_evacuation_velocity=3)
+        rows, stats = timed(analysis, analysis.one_at_a_time)
+        print(f"{scheduler} one-at-a-time (+/-50%), base total {analysis.base_total}: {2 * len(analysis.parameters)} runs {stats}")
+        print(format_table(rows))
+        rows, stats = timed(analysis, analysis.latin_hypercube, samples)
+        totals = analysis.last_totals
+        print(f"\n{scheduler} Latin hypercube: {samples} runs {stats}; total min {totals.min()} / mean {totals.mean():.1f} / max {totals.max()}")
+        print(format_table(rows[:8]))
+        session = analysis.session
+        non_topological = SensitivityAnalysis(session, scheduler, room_parameters(session, (EXPLORE_TIME, VELOCITY)), 3)
+        rows, stats = timed(non_topological, non_topological.latin_hypercube, samples)
+        print(f"\n{scheduler} Latin hypercube without door weights: {samples} runs {stats}")
+        print(format_table(rows[:5]))
+        print()
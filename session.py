@@ -0,0 +1,189 @@
+from typing import List, Optional, Tuple
+from graph import Graph
+from explorer import Explorer
+from firefighter import Firefighter
+from location import Room, RoomState
+
+_STATES: List[RoomState] = list(RoomState)
+_CODE = {state: code for code, state in enumerate(_STATES)}
+
+class BuildingState:
+    """
+    Mutable simulation state of a building, kept in flat arrays indexed by location index.
+      - room_state: bytearray     - Code of each location's RoomState (position in RoomState); NA for non-rooms.
+      - person_lists: List[dict]  - Occupants of each location.
+    Once bound, Room.state and Location.person_list read and write these arrays, and every write
+    records (array, index, old value) in a journal. Restoring a journal mark undoes only the writes
+    made after it, so snapshot/restore is O(changed) instead of a reload of the building.
+    A mark is a (position, epoch) pair, the epoch being the serial number of the write just before
+    it: once a restore or commit has discarded that write, later writes can refill the position,
+    but the epoch no longer matches and restoring the stale mark raises ValueError.
+    """
+    def __init__(self, graph: Graph):
+        n = len(graph)
+        self.room_state = bytearray([_CODE[RoomState.NA]]) * n
+        self.person_lists: List[dict] = []
+        self._journal: List[Tuple[object, int, object]] = []
+        self._serials: List[int] = []  # Serial number of each journal entry
+        self._writes = 0
+        self._base = 0                 # Epoch of journal position 0
+        for i, location in enumerate(graph.locations):
+            if isinstance(location, Room):
+                self.room_state[i] = _CODE[location.state]
+            self.person_lists.append(location.person_list)
+
+    def bind(self, graph: Graph) -> None:
+        """Makes the graph's locations read and write their state through this object."""
+        for i, location in enumerate(graph.locations):
+            location._idx = i
+            location._store = self
+
+    def unbind(self, graph: Graph) -> None:
+        """Copies the current state back into the locations and detaches them."""
+        for i, location in enumerate(graph.locations):
+            location._store = None
+            location.person_list = self.person_lists[i]
+            if isinstance(location, Room):
+                location.state = _STATES[self.room_state[i]]
+
+    def get_room_state(self, idx: int) -> RoomState:
+        return _STATES[self.room_state[idx]]
+
+    def set_room_state(self, idx: int, state: RoomState) -> None:
+        self._record(self.room_state, idx)
+        self.room_state[idx] = _CODE[state]
+
+    def set_person_list(self, idx: int, person_list: dict) -> None:
+        self._record(self.person_lists, idx)
+        self.person_lists[idx] = person_list
+
+    def _record(self, array, idx: int) -> None:
+        self._writes += 1
+        self._journal.append((array, idx, array[idx]))
+        self._serials.append(self._writes)
+
+    def _epoch(self, position: int) -> int:
+        return self._serials[position - 1] if position else self._base
+
+    def mark(self) -> Tuple[int, int]:
+        """Returns a (journal position, epoch) pair to restore to later."""
+        position = len(self._journal)
+        return position, self._epoch(position)
+
+    def restore(self, mark: Tuple[int, int]) -> None:
+        """Undoes every write made after `mark`, newest first."""
+        position, epoch = mark
+        journal = self._journal
+        if position > len(journal) or self._epoch(position) != epoch:
+            raise ValueError("Journal mark is stale (the writes before it were undone or committed)")
+        while len(journal) > position:
+            array, idx, old = journal.pop()
+            self._serials.pop()
+            array[idx] = old
+
+    def commit(self) -> None:
+        """Forgets the journal, making the current state the oldest one that can be restored."""
+        self._journal.clear()
+        self._serials.clear()
+        self._writes += 1
+        self._base = self._writes
+
+
+class Snapshot:
+    """A restorable point of a BuildingSession: a journal mark plus each firefighter's state."""
+    def __init__(self, mark: Tuple[int, int], firefighters: List[Tuple[Firefighter, Optional[int], int, dict]]):
+        self.mark = mark
+        self.firefighters = firefighters
+
+
+class BuildingSession:
+    """
+    Loads a building once and runs many scenarios on it.
+    The immutable topology (graph edges, Explorer shortest paths) is shared by all runs, while the
+    mutable state (room states, occupants, firefighter positions) is snapshotted and restored.
+    Initialization:
+      - filepath: building JSON loaded with drawer.load_basic_floor, or
+      - graph / explorer: an already loaded building (explorer is built if omitted).
+    """
+    def __init__(self, filepath: Optional[str] = None, graph: Optional[Graph] = None, explorer: Optional[Explorer] = None):
+        if graph is None:
+            from drawer import load_basic_floor
+            graph = load_basic_floor(filepath)
+        self.graph = graph
+        self.explorer = explorer if explorer is not None else Explorer(graph)
+        self.state = BuildingState(graph)
+        self.state.bind(graph)
+        self.firefighters: List[Firefighter] = []
+        self._baseline = self.snapshot()
+
+    def add_firefighter(self, ID: int, velocity: int, start_label: Optional[str] = None) -> Firefighter:
+        """Creates a firefighter whose position, clock and carried people are part of snapshots."""
+        firefighter = Firefighter(ID, velocity, self.explorer)
+        if start_label is not None:
+            firefighter.setPos(start_label)
+        self.firefighters.append(firefighter)
+        return firefighter
+
+    def snapshot(self) -> Snapshot:
+        return Snapshot(self.state.mark(),
+                        [(f, f.location_idx, f.clock, dict(f.person_list)) for f in self.firefighters])
+
+    def restore(self, snapshot: Snapshot) -> None:
+        """
+        Returns rooms, occupants and the snapshot's firefighters to the snapshotted state.
+        Raises ValueError if the snapshot is stale (an earlier restore or rebase undid its writes).
+        """
+        self.state.restore(snapshot.mark)
+        for f, location_idx, clock, person_list in snapshot.firefighters:
+            f.location_idx = location_idx
+            f.clock = clock
+            f.person_list = dict(person_list)
+        del self.firefighters[len(snapshot.firefighters):]
+
+    def reset(self) -> None:
+        """Restores the state the session was created (or last rebased) with."""
+        self.restore(self._baseline)
+
+    def set_baseline(self, snapshot: Optional[Snapshot] = None) -> Snapshot:
+        """
+        Makes `snapshot` (default: the current state) what reset() returns to, keeping the journal so
+        an earlier baseline can still be restored. Returns the previous baseline.
+        """
+        previous = self._baseline
+        self._baseline = snapshot if snapshot is not None else self.snapshot()
+        return previous
+
+    def rebase(self) -> None:
+        """Makes the current state the new baseline for reset(), e.g. after editing the building."""
+        self.state.commit()
+        self._baseline = self.snapshot()
+
+    def close(self) -> None:
+        """Detaches the graph's locations, leaving them with the current state."""
+        self.state.unbind(self.graph)
+
+# Benchmark: python session.py
+# Repeats the scenarios of main.py with a full reload per run and with one shared session.
+if __name__ == "__main__":
+    import contextlib
+    import io
+    import time
+    import main
+
+    runs = 200
+    for name, scheduler in (("1FF", main.rescue_building_1FF), ("2FF", main.rescue_building_2FF)):
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            fresh = [scheduler() for _ in range(runs)]
+            t_fresh = time.perf_counter() - t0
+            session = BuildingSession('Figure1_building_structure.json')
+            t0 = time.perf_counter()
+            shared = [scheduler(session) for _ in range(runs)]
+            t_shared = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            for _ in range(runs):
+                session.reset()
+            t_reset = time.perf_counter() - t0
+        assert fresh == shared, (fresh[:3], shared[:3])
+        print(f"{name}: total={shared[0]} | reload per run {t_fresh / runs * 1e3:.3f} ms"
+              f" | shared session {t_shared / runs * 1e3:.3f} ms | reset alone {t_reset / runs * 1e6:.1f} us")
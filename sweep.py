@@ -0,0 +1,214 @@
+import argparse
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
+from explorer_cache import _atomic_write
+from scenario import Scenario, ScenarioRunner
+
+JOURNAL = "journal.jsonl"
+CHUNK_PREFIX = "chunk-"
+CHUNK_SUFFIX = ".json"
+
+class SweepJournal:
+    """
+    Append-only JSONL log of completed scenarios, one {"id": ..., ...row} object per line.
+    Every record is written and flushed immediately, but os.fsync runs only every `fsync_every`
+    records or `fsync_interval` seconds, so a crash loses at most that batch. On open, a torn last
+    line (the process died mid-write) is cut off, so the file always ends with a complete record.
+    """
+    def __init__(self, path: str, fsync_every: int = 64, fsync_interval: float = 5.0):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.rows: List[dict] = _read_journal(path)
+        self._file = open(path, "a", encoding="utf-8")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def completed(self) -> set:
+        return {row["id"] for row in self.rows}
+
+    def append(self, row: dict) -> None:
+        self._file.write(json.dumps(row, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self.rows.append(row)
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self) -> None:
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        self.sync()
+        self._file.close()
+
+def _read_journal(path: str) -> List[dict]:
+    rows: List[dict] = []
+    if not os.path.exists(path):
+        return rows
+    good = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                break
+            good += len(line)
+    if good != os.path.getsize(path):
+        with open(path, "r+b") as f:
+            f.truncate(good)
+    return rows
+
+
+class ChunkWriter:
+    """
+    Writes journal rows as columnar chunks, chunk-NNNNNN.json = {"columns": {name: [values]}},
+    once `chunk_size` rows are pending. Chunks are written atomically (temporary file + rename),
+    so readers see whole chunks only. Rows already journaled but not yet chunked are recovered on resume.
+    """
+    def __init__(self, directory: str, chunk_size: int = 256):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.chunked_ids = set()
+        self.next_chunk = 0
+        for name in _chunk_files(directory):
+            with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+                self.chunked_ids.update(json.load(f)["columns"]["id"])
+            self.next_chunk = max(self.next_chunk, int(name[len(CHUNK_PREFIX):-len(CHUNK_SUFFIX)]) + 1)
+        self.pending: List[dict] = []
+
+    def add(self, row: dict) -> None:
+        if row["id"] in self.chunked_ids:
+            return
+        self.pending.append(row)
+        if len(self.pending) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes all pending rows as one chunk (no-op if there are none)."""
+        if not self.pending:
+            return
+        path = os.path.join(self.directory, f"{CHUNK_PREFIX}{self.next_chunk:06d}{CHUNK_SUFFIX}")
+        _atomic_write(path, json.dumps({"columns": _columns(self.pending)}, separators=(",", ":")))
+        self.chunked_ids.update(row["id"] for row in self.pending)
+        self.next_chunk += 1
+        self.pending = []
+
+def _chunk_files(directory: str) -> List[str]:
+    return sorted(name for name in os.listdir(directory) if name.startswith(CHUNK_PREFIX) and name.endswith(CHUNK_SUFFIX))
+
+def _columns(rows: List[dict]) -> Dict[str, list]:
+    names: List[str] = []
+    for row in rows:
+        names.extend(name for name in row if name not in names)
+    return {name: [row.get(name) for row in rows] for name in names}
+
+
+def run_sweep(scenarios: Union[Dict[str, Scenario], Iterable[Tuple[str, Scenario]]], directory: str,
+              runner: Optional[ScenarioRunner] = None, chunk_size: int = 256, fsync_every: int = 64,
+              fsync_interval: float = 5.0, limit: Optional[int] = None) -> dict:
+    """
+    Runs every scenario whose ID is not yet in the directory's journal, journaling each result and
+    writing columnar chunks as it goes; rerunning with the same directory resumes where it stopped.
+    limit stops after that many new runs (as if the process died). Returns counts of the run.
+    """
+    os.makedirs(directory, exist_ok=True)
+    runner = runner if runner is not None else ScenarioRunner()
+    journal = SweepJournal(os.path.join(directory, JOURNAL), fsync_every, fsync_interval)
+    chunks = ChunkWriter(directory, chunk_size)
+    for row in journal.rows:
+        chunks.add(row)
+    done = journal.completed()
+    items = scenarios.items() if isinstance(scenarios, dict) else scenarios
+    skipped = ran = 0
+    try:
+        for scenario_id, scenario in items:
+            if scenario_id in done:
+                skipped += 1
+                continue
+            if limit is not None and ran >= limit:
+                break
+            row = {
+                "id": scenario_id,
+                "building": scenario.building,
+                "scheduler": scenario.scheduler,
+                "self_evacuation_velocity": scenario.self_evacuation_velocity,
+                "occupants": json.dumps(scenario.occupants, sort_keys=True),
+                **runner.run(scenario),
+            }
+            journal.append(row)
+            chunks.add(row)
+            done.add(scenario_id)
+            ran += 1
+        chunks.flush()
+    finally:
+        journal.close()
+    return {"ran": ran, "skipped": skipped, "completed": len(done), "chunks": chunks.next_chunk}
+
+def load_results(directory: str, include_pending: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Returns all results as columns (numpy arrays, object dtype for mixed columns), readable while a
+    sweep is running. Rows come from the chunks, plus journaled rows not chunked yet when include_pending.
+    """
+    rows: List[dict] = []
+    seen = set()
+    for name in _chunk_files(directory):
+        try:
+            with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+                columns = json.load(f)["columns"]
+        except (OSError, ValueError):
+            continue
+        count = len(columns["id"])
+        rows.extend({key: values[i] for key, values in columns.items()} for i in range(count))
+        seen.update(columns["id"])
+    if include_pending:
+        path = os.path.join(directory, JOURNAL)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    row = json.loads(line)
+                    if row["id"] not in seen:
+                        rows.append(row)
+                        seen.add(row["id"])
+    columns = _columns(rows)
+    out = {}
+    for name, values in columns.items():
+        array = np.asarray(values, dtype=object)
+        if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+            array = np.asarray(values)
+        out[name] = array
+    return out
+
+# Command line: python sweep.py DIR [--limit N] [--chunk-size N]
+# Sweeps occupancy variants of three Figure 1 rooms for both schedulers; rerun to resume.
+if __name__ == "__main__":
+    import itertools
+    parser = argparse.ArgumentParser(description="Run (or resume) a checkpointed rescue sweep.")
+    parser.add_argument("directory")
+    parser.add_argument("--limit", type=int, default=None, help="stop after N new scenarios")
+    parser.add_argument("--chunk-size", type=int, default=256)
+    args = parser.parse_args()
+
+    variants = [[], [1], [3], [1, 5], [2, 2, 6]]
+    scenarios = {}
+    for scheduler in ("1FF", "2FF"):
+        for tl, tm, br in itertools.product(variants, repeat=3):
+            key = f"{scheduler}-TL{'_'.join(map(str, tl))}-TM{'_'.join(map(str, tm))}-BR{'_'.join(map(str, br))}"
+            scenarios[key] = Scenario(scheduler=scheduler, occupants={"TL": tl, "TM": tm, "BR": br})
+    t0 = time.perf_counter()
+    summary = run_sweep(scenarios, args.directory, chunk_size=args.chunk_size, limit=args.limit)
+    print(f"{summary} in {time.perf_counter() - t0:.2f} s")
+    results = load_results(args.directory)
+    if len(results):
+        totals = results["total_time"]
+        print(f"{len(totals)} results on disk, total_time min {totals.min()} / mean {totals.mean():.1f} / max {totals.max()}")
@@ -0,0 +1,185 @@
+from bisect import bisect_right
+from collections import OrderedDict
+from heapq import heappush, heappop
+from typing import Iterable, List, Optional, Sequence, Tuple
+from graph import Graph
+
+class TravelTimeProfile:
+    """
+    Piecewise-linear traversal cost of an edge as a function of the time it is entered.
+    The cost is in the same distance units as the static edge weight, so a walker with
+    velocity v entering at time t leaves at t + cost(t) / v.
+    Initialization:
+      - points: (time, cost) breakpoints sorted by time. The cost is linearly interpolated
+        between breakpoints and held constant before the first and after the last one.
+    Costs may only fall by at most one unit per time unit, which keeps every walker with
+    velocity >= 1 FIFO (entering later never means leaving earlier).
+    """
+    def __init__(self, points: Sequence[Tuple[float, float]]):
+        if not points:
+            raise ValueError("A travel time profile needs at least one breakpoint")
+        self.times: List[float] = [float(t) for t, _ in points]
+        self.costs: List[float] = [float(c) for _, c in points]
+        for i in range(1, len(self.times)):
+            dt = self.times[i] - self.times[i - 1]
+            if dt <= 0:
+                raise ValueError("Breakpoint times must be strictly increasing")
+            if (self.costs[i] - self.costs[i - 1]) / dt < -1:
+                raise ValueError("Cost may not decrease faster than 1 per time unit (FIFO)")
+        if min(self.costs) < 0:
+            raise ValueError("Costs must be non-negative")
+
+    def cost(self, t: float) -> float:
+        """Returns the traversal cost for entering the edge at time t."""
+        times = self.times
+        i = bisect_right(times, t)
+        if i == 0:
+            return self.costs[0]
+        if i == len(times):
+            return self.costs[-1]
+        t0, t1 = times[i - 1], times[i]
+        c0, c1 = self.costs[i - 1], self.costs[i]
+        return c0 + (c1 - c0) * (t - t0) / (t1 - t0)
+
+    def min_cost_from(self, t: float) -> float:
+        """Returns the lowest traversal cost for entering the edge at any time >= t."""
+        i = bisect_right(self.times, t)
+        return min([self.cost(t)] + self.costs[i:])
+
+    def __repr__(self) -> str:
+        return f"<TravelTimeProfile {list(zip(self.times, self.costs))}>"
+
+
+class TimeDependentRouter:
+    """
+    FIFO time-dependent Dijkstra over a Graph. Edges with a TravelTimeProfile use it,
+    all other edges use their static weight.
+    Results are cached per (source, targets, velocity, time bucket), keeping at most max_entries
+    buckets (least recently used are dropped). A bucket stores a lower bound on the travel time for
+    any departure inside it (static Dijkstra on each edge's cheapest cost from the bucket start on)
+    and the routes searched so far. A query re-times those routes at its actual departure and returns
+    the fastest one if it meets the bound; otherwise it searches at the actual departure and adds the
+    route to the bucket. Results are therefore always exact.
+    The cache is dropped whenever the graph is mutated.
+    """
+    def __init__(self, graph: Graph, bucket: float = 10, max_entries: int = 1024):
+        self.graph = graph
+        self.bucket = bucket
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple, Tuple[Optional[float], List[List[int]]]]" = OrderedDict()
+        self._version = graph._version
+
+    def _bucket_start(self, depart: float) -> float:
+        return (depart // self.bucket) * self.bucket
+
+    def _cached_search(self, u: int, targets: Tuple[int, ...], depart: float, velocity: float) -> Tuple[Optional[float], List[int]]:
+        """Returns (travel_time, path_indices) to the earliest-reached target, or (None, [])."""
+        if self._version != self.graph._version:
+            self._cache.clear()
+            self._version = self.graph._version
+        key = (u, targets, velocity, self._bucket_start(depart))
+        entry = self._cache.get(key)
+        if entry is None:
+            entry = self._cache[key] = (self._lower_bound(u, targets, key[3], velocity), [])
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        bound, paths = entry
+        if bound is None:
+            return None, []
+
+        best_time: Optional[float] = None
+        best_path: List[int] = []
+        for path in paths:
+            t = self.path_time(path, depart, velocity)
+            if best_time is None or t < best_time:
+                best_time, best_path = t, path
+        if best_time is not None and best_time <= bound + 1e-9:
+            return best_time, best_path
+
+        _, path = self._search(u, targets, depart, velocity)
+        if path not in paths:
+            paths.append(path)
+            del paths[:-8]  # A handful of routes covers a bucket; keep entries small
+        return self.path_time(path, depart, velocity), path
+
+    def edge_cost(self, u: int, v: int, t: float) -> float:
+        profile = self.graph.edge_profile(u, v)
+        if profile is None:
+            return self.graph._adj[u][v]
+        return profile.cost(t)
+
+    def path_time(self, path: List[int], depart: float, velocity: float) -> float:
+        """Returns the time needed to walk the given index path when leaving at `depart`."""
+        t = depart
+        for a, b in zip(path, path[1:]):
+            t += self.edge_cost(a, b, t) / velocity
+        return t - depart
+
+    def _lower_bound(self, source: int, targets: Iterable[int], start: float, velocity: float) -> Optional[float]:
+        """Travel time to the nearest target using every edge's cheapest cost from `start` on; None if unreachable."""
+        targets = set(targets)
+        adj = self.graph._adj
+        profiles = self.graph._profiles
+        dist = {source: 0.0}
+        done = set()
+        heap = [(0.0, source)]
+        while heap:
+            d, x = heappop(heap)
+            if x in done:
+                continue
+            if x in targets:
+                return d
+            done.add(x)
+            for y, w in adj[x].items():
+                profile = profiles.get((x, y) if x <= y else (y, x))
+                dy = d + (w if profile is None else profile.min_cost_from(start)) / velocity
+                if dy < dist.get(y, float("inf")):
+                    dist[y] = dy
+                    heappush(heap, (dy, y))
+        return None
+
+    def _search(self, source: int, targets: Iterable[int], depart: float, velocity: float) -> Tuple[Optional[int], List[int]]:
+        """Runs time-dependent Dijkstra until the earliest-reached target is settled."""
+        targets = set(targets)
+        adj = self.graph._adj
+        arrival = {source: depart}
+        parent = {source: source}
+        done = set()
+        heap = [(depart, source)]
+        while heap:
+            t, x = heappop(heap)
+            if x in done:
+                continue
+            if x in targets:
+                path = [x]
+                while path[-1] != source:
+                    path.append(parent[path[-1]])
+                path.reverse()
+                return x, path
+            done.add(x)
+            for y in adj[x]:
+                ty = t + self.edge_cost(x, y, t) / velocity
+                if ty < arrival.get(y, float("inf")):
+                    arrival[y] = ty
+                    parent[y] = x
+                    heappush(heap, (ty, y))
+        return None, []
+
+    def route(self, u: int, v: int, depart: float, velocity: float) -> Tuple[Optional[float], List[int]]:
+        """
+        Returns (travel_time, path_indices) from u to v leaving at `depart`.
+        Returns (None, []) if v is not reachable.
+        """
+        return self._cached_search(u, (v,), depart, velocity)
+
+    def nearest(self, u: int, targets: Sequence[int], depart: float, velocity: float) -> Tuple[Optional[float], Optional[int], List[int]]:
+        """
+        Returns (travel_time, target, path_indices) for the target reached earliest from u.
+        Returns (None, None, []) if no target is reachable.
+        """
+        travel, path = self._cached_search(u, tuple(targets), depart, velocity)
+        if not path:
+            return None, None, []
+        return travel, path[-1], path
@@ -0,0 +1,227 @@
+import argparse
+import contextlib
+import io
+import os
+import time
+from typing import Callable, Dict, Optional, Tuple
+from drawer import load_basic_floor
+from graph import Graph
+from location import Room
+from person import Person
+from session import BuildingSession
+
+class BuildingDelta:
+    """
+    Differences between a building file and a loaded building, matched by location label:
+      - occupants: {label: new person_list}
+      - rooms: {label: {"explore_time": ..., "size": ...}} (changed attributes only)
+      - edges: {(label_u, label_v): new weight, or None if removed}
+      - structural: True if locations were added, removed or changed type (needs a full reload)
+    """
+    def __init__(self):
+        self.occupants: Dict[str, dict] = {}
+        self.rooms: Dict[str, dict] = {}
+        self.edges: Dict[Tuple[str, str], Optional[int]] = {}
+        self.structural = False
+
+    def __bool__(self) -> bool:
+        return self.structural or bool(self.occupants or self.rooms or self.edges)
+
+    def __repr__(self) -> str:
+        if self.structural:
+            return "<BuildingDelta structural>"
+        return f"<BuildingDelta occupants={sorted(self.occupants)} rooms={self.rooms} edges={self.edges}>"
+
+def diff_building(live: Graph, new: Graph) -> BuildingDelta:
+    """Compares `new` (freshly loaded) against `live` by label."""
+    delta = BuildingDelta()
+    live_idx = {location.label: i for i, location in enumerate(live.locations)}
+    new_idx = {location.label: i for i, location in enumerate(new.locations)}
+    if live_idx.keys() != new_idx.keys():
+        delta.structural = True
+        return delta
+    for label, i in new_idx.items():
+        old, cur = live.get_location(live_idx[label]), new.get_location(i)
+        if type(old) is not type(cur) or old.is_exit != cur.is_exit or old.is_hallway != cur.is_hallway:
+            delta.structural = True
+            return delta
+        if _people(old.person_list) != _people(cur.person_list):
+            delta.occupants[label] = cur.person_list
+        if isinstance(cur, Room):
+            changed = {name: getattr(cur, name) for name in ("explore_time", "size") if getattr(old, name) != getattr(cur, name)}
+            if changed:
+                delta.rooms[label] = changed
+
+    labels = [location.label for location in new.locations]
+    old_edges = {_edge_key(live.locations[u].label, live.locations[v].label): w for u, v, w in live.edges()}
+    new_edges = {_edge_key(labels[u], labels[v]): w for u, v, w in new.edges()}
+    for key, w in new_edges.items():
+        if old_edges.get(key) != w:
+            delta.edges[key] = w
+    for key in old_edges.keys() - new_edges.keys():
+        delta.edges[key] = None
+    return delta
+
+def _people(person_list: dict) -> Dict[int, int]:
+    return {pid: p.velocity for pid, p in person_list.items()}
+
+def _edge_key(a: str, b: str) -> Tuple[str, str]:
+    return (a, b) if a <= b else (b, a)
+
+
+class BuildingWatcher:
+    """
+    Keeps a BuildingSession in sync with its building file. check() reloads the file when its
+    modification time changed, diffs it against the live graph and applies only the delta:
+      - occupant and explore_time changes touch no shortest path data;
+      - edge weight changes are applied to the graph and passed to Explorer.edges_changed as one
+        batch, which relaxes decreases in O(n^2) each and recomputes the tables at most once, only
+        when an edge some shortest path relied on got longer or closed;
+      - added, removed or retyped locations fall back to a full reload.
+    The session is then rebased so reset() starts from the edited building, and `plan` (by default
+    main.rescue_building_1FF) is rerun. Each check returns a report with the timings, including the
+    time from the file's save (its mtime) to the updated plan.
+    """
+    def __init__(self, filepath: str, session: Optional[BuildingSession] = None,
+                 plan: Optional[Callable[[BuildingSession], int]] = None):
+        self.filepath = filepath
+        self.session = session if session is not None else BuildingSession(filepath)
+        if plan is None:
+            import main
+            plan = main.rescue_building_1FF
+        self.plan = plan
+        self._mtime = os.stat(filepath).st_mtime_ns
+
+    def check(self) -> Optional[dict]:
+        """Applies the file's changes if it was saved since the last check. Returns a report, or None."""
+        try:
+            mtime = os.stat(self.filepath).st_mtime_ns
+        except OSError:
+            return None
+        if mtime == self._mtime:
+            return None
+        self._mtime = mtime
+        t0 = time.perf_counter()
+        try:
+            new = load_basic_floor(self.filepath)
+        except (OSError, ValueError, KeyError):
+            # Half-written file; the next save triggers another check
+            return {"error": "unreadable building file"}
+        t_load = time.perf_counter()
+        # Compare against the building as loaded, not as left by the last plan run
+        self.session.reset()
+        delta = diff_building(self.session.graph, new)
+        recomputed = self.apply(delta, new)
+        t_apply = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            total = self.plan(self.session)
+        t_plan = time.perf_counter()
+        return {
+            "delta": delta,
+            "recomputed": recomputed,
+            "total_time": total,
+            "load_ms": (t_load - t0) * 1e3,
+            "apply_ms": (t_apply - t_load) * 1e3,
+            "plan_ms": (t_plan - t_apply) * 1e3,
+            "save_to_plan_ms": (time.time_ns() - mtime) / 1e6,
+        }
+
+    def apply(self, delta: BuildingDelta, new: Graph) -> str:
+        """
+        Applies delta to the live session. Returns what was recomputed: "nothing", "incremental",
+        "tables" (full shortest path recomputation) or "reload" (new session).
+        """
+        if delta.structural:
+            self.session.close()
+            self.session = BuildingSession(graph=new)
+            return "reload"
+        session = self.session
+        explorer = session.explorer
+        session.reset()
+        for label, person_list in delta.occupants.items():
+            explorer.get_location_by_label(label).person_list = {pid: Person(pid, p.velocity) for pid, p in person_list.items()}
+        for label, changed in delta.rooms.items():
+            room = explorer.get_location_by_label(label)
+            for name, value in changed.items():
+                setattr(room, name, value)
+        recomputed = "nothing"
+        if delta.edges:
+            graph = session.graph
+            changes = []
+            for (a, b), w in delta.edges.items():
+                u, v = explorer.label_to_idx[a], explorer.label_to_idx[b]
+                changes.append((u, v, graph.weight(u, v), w))
+                if w is None:
+                    graph.remove_edge(u, v)
+                else:
+                    graph.add_edge(u, v, w)
+            explorer.invalidate_escape_routes()
+            # One table update for the whole batch: at most one recomputation however many edges changed
+            recomputed = "tables" if explorer.edges_changed(changes) else "incremental"
+        session.rebase()
+        return recomputed
+
+    def watch(self, interval: float = 0.2, on_update: Optional[Callable[[dict], None]] = None) -> None:
+        """Polls the file every `interval` seconds until interrupted, calling on_update(report) after each change."""
+        on_update = on_update or (lambda report: print(format_report(report)))
+        while True:
+            report = self.check()
+            if report is not None:
+                on_update(report)
+            time.sleep(interval)
+
+def format_report(report: dict) -> str:
+    if "error" in report:
+        return report["error"]
+    return (f"{report['delta']} -> recomputed {report['recomputed']}, total time {report['total_time']}"
+            f" | load {report['load_ms']:.2f} ms, apply {report['apply_ms']:.2f} ms, plan {report['plan_ms']:.2f} ms,"
+            f" save to plan {report['save_to_plan_ms']:.1f} ms")
+
+# Command line: python watch.py [building.json] [--demo]
+# Watches the building file and replans on every save; --demo edits a temporary copy instead.
+if __name__ == "__main__":
+    import json
+    import shutil
+    import tempfile
+    parser = argparse.ArgumentParser(description="Replan whenever the building file changes.")
+    parser.add_argument("building", nargs="?", default='Figure1_building_structure.json')
+    parser.add_argument("--demo", action="store_true", help="apply scripted edits to a temporary copy")
+    parser.add_argument("--interval", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if not args.demo:
+        print(f"Watching {args.building} (Ctrl+C to stop)")
+        try:
+            BuildingWatcher(args.building).watch(args.interval)
+        except KeyboardInterrupt:
+            pass
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, os.path.basename(args.building))
+            shutil.copy(args.building, path)
+            watcher = BuildingWatcher(path)
+
+            def edit(description: str, change: Callable[[list], None]) -> None:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                change(data)
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=2)
+                print(f"{description}:\n  {format_report(watcher.check())}")
+
+            def entry(data: list, label: str) -> dict:
+                return next(d for d in data if d.get("label") == label)
+
+            def edge(data: list, a: str, b: str) -> dict:
+                return next(d for d in data if d["type"] == "EDGE" and {d["u"], d["v"]} == {a, b})
+
+            edit("TL occupants now all walk at 3", lambda d: [p.update(velocity=3) for p in entry(d, "TL")["person_list"]])
+            edit("TM explore_time 10 -> 4", lambda d: entry(d, "TM").update(explore_time=4))
+            edit("H_M-H_R weight 5 -> 2", lambda d: edge(d, "H_M", "H_R").update(weight=2))
+            edit("H_M-H_R weight 2 -> 9", lambda d: edge(d, "H_M", "H_R").update(weight=9))
+            edit("H_L-EXIT_L and H_R-EXIT_R weights +3 in one save",
+                 lambda d: [e.update(weight=e["weight"] + 3) for e in (edge(d, "H_L", "EXIT_L"), edge(d, "H_R", "EXIT_R"))])
+            fresh = BuildingSession(path)
+            with contextlib.redirect_stdout(io.StringIO()):
+                assert watcher.plan(fresh) == watcher.plan(watcher.session)
+            print("Replanned total matches a full reload of the edited file")